@@ -1,11 +1,112 @@
 # ai_engine.py
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.schema import HumanMessage, SystemMessage, AIMessage
 from typing import Generator
+from collections import deque
+import os
+import threading
 
 
 _llm = None
 
+# Prompt budgeting. Gemini averages roughly 4 characters per token for English
+# text, which is close enough to keep the prompt size flat over a session.
+CHARS_PER_TOKEN = 4
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "600"))
+
+
+def count_tokens(text: str) -> int:
+    """Cheap prompt-size estimate used for history budgeting (not billing)."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+class ConversationMemory:
+    """
+    Interview history kept under a fixed token budget.
+
+    The most recent question/answer turns are re-sent verbatim; turns that fall
+    out of the window are folded into a short one-line summary, which is itself
+    capped by ``summary_budget``. Prompt size therefore stays flat no matter how
+    long the interview runs.
+    """
+
+    def __init__(self, system_prompt: str, token_budget: int = HISTORY_TOKEN_BUDGET,
+                 summary_budget: int = SUMMARY_TOKEN_BUDGET):
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.turns = deque()            # (question, answer, tokens)
+        self.window_tokens = 0
+        self.summary_lines = deque()    # (line, tokens)
+        self.summary_tokens = 0
+        self.stats = deque(maxlen=200)  # prompt size per call
+        self._lock = threading.Lock()
+
+    def add_turn(self, question: str, answer: str):
+        tokens = count_tokens(question) + count_tokens(answer)
+        with self._lock:
+            self.turns.append((question, answer, tokens))
+            self.window_tokens += tokens
+            while self.turns and self.window_tokens > self.token_budget:
+                old_q, old_a, old_tokens = self.turns.popleft()
+                self.window_tokens -= old_tokens
+                self._fold_into_summary(old_q, old_a)
+
+    def _fold_into_summary(self, question: str, answer: str):
+        line = f"- Q: {_clip(question, 120)} | A: {_clip(answer, 160)}"
+        tokens = count_tokens(line)
+        self.summary_lines.append((line, tokens))
+        self.summary_tokens += tokens
+        while self.summary_lines and self.summary_tokens > self.summary_budget:
+            _, dropped = self.summary_lines.popleft()
+            self.summary_tokens -= dropped
+
+    def build_messages(self, question: str) -> list:
+        """Return the prompt for ``question`` and record its size in ``stats``."""
+        with self._lock:
+            system = self.system_prompt
+            if self.summary_lines:
+                system += "\n\nEARLIER IN THIS INTERVIEW (summary):\n" + "\n".join(
+                    line for line, _ in self.summary_lines
+                )
+            messages = [SystemMessage(content=system)]
+            for q, a, _ in self.turns:
+                messages.append(HumanMessage(content=f"Interview question: {q}"))
+                messages.append(AIMessage(content=a))
+            messages.append(HumanMessage(content=f"Interview question: {question}"))
+
+            stats = {
+                "system_tokens": count_tokens(self.system_prompt),
+                "summary_tokens": self.summary_tokens,
+                "history_tokens": self.window_tokens,
+                "question_tokens": count_tokens(question),
+                "turns": len(self.turns),
+                "summarized_turns": len(self.summary_lines),
+            }
+            stats["total_tokens"] = (stats["system_tokens"] + stats["summary_tokens"]
+                                     + stats["history_tokens"] + stats["question_tokens"])
+            self.stats.append(stats)
+        return messages
+
+    def last_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats[-1]) if self.stats else {}
+
+    def clear(self):
+        with self._lock:
+            self.turns.clear()
+            self.summary_lines.clear()
+            self.window_tokens = 0
+            self.summary_tokens = 0
+
 def configure_google_ai(api_key: str):
     
     global _llm
@@ -33,34 +134,43 @@ def build_chat(resume_summary: str):
         f"RESUME:\n{resume_summary}"
     )
 
-    history = [SystemMessage(content=system_prompt)]
     #print(">> testing the llm", _llm.invoke([HumanMessage(content="Hello")]))
-    return (_llm, history)
+    return (_llm, ConversationMemory(system_prompt))
 
 
-def get_response_from_chat_stream(chat: tuple, question: str) -> Generator[str, None, None]:
+def get_response_from_chat_stream(chat: tuple, question: str, remember: bool = True) -> Generator[str, None, None]:
     
     from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 
-    llm, history = chat
+    llm, memory = chat
     callbacks = [StreamingStdOutCallbackHandler()]
     print(">> Gemini called for:", question)
 
-    history.append(HumanMessage(content=f"Interview question: {question}"))
+    messages = memory.build_messages(question)
+    stats = memory.last_stats()
+    print(f">> Prompt size: ~{stats['total_tokens']} tokens "
+          f"({stats['turns']} recent turns, {stats['summarized_turns']} summarized)")
 
+    parts = []
     try:
-        stream = llm.stream(history)
+        stream = llm.stream(messages)
         for chunk in stream:
             if chunk.content:
+                parts.append(chunk.content)
                 yield chunk.content
     except Exception as e:
         if "429" in str(e) or "quota" in str(e).lower():
             print("[WARN] Streaming not available; falling back to invoke()")
-            response = llm.invoke(history)
+            response = llm.invoke(messages)
+            parts = [response.content]
             yield response.content
         else:
             raise
 
+    # Only completed answers are remembered; an abandoned stream leaves no turn.
+    if remember:
+        memory.add_turn(question, "".join(parts))
+
 
 def estimate_tokens(text: str) -> int:
 
@@ -69,3 +179,90 @@ def estimate_tokens(text: str) -> int:
     word_count = len(text.split())
     # Charge 1 credit per 100 words (minimum 1 credit)
     return max(1, word_count // 100 + (1 if word_count % 100 > 0 else 0))
+
+
+class StreamHandle:
+    """A single generation started through the scheduler; iterate it for chunks."""
+
+    def __init__(self, scheduler, request_id, chat, question, remember, slot):
+        self.scheduler = scheduler
+        self.request_id = request_id
+        self.question = question
+        self.slot = slot
+        self._chat = chat
+        self._remember = remember
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def __iter__(self):
+        if self.cancelled:
+            return
+        stream = get_response_from_chat_stream(self._chat, self.question, remember=self._remember)
+        try:
+            for chunk in stream:
+                if self.cancelled:
+                    print(f">> Request {self.request_id} superseded; closing stream")
+                    break
+                yield chunk
+        finally:
+            # Closing the generator tears down the HTTP stream and skips the memory write.
+            stream.close()
+            self.scheduler._release(self)
+
+
+class StreamScheduler:
+    """
+    Allows one active generation per slot. Starting a new request in a slot
+    cooperatively cancels the previous one, which stops at its next chunk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._active = {}
+
+    def start(self, chat, question: str, remember: bool = True, slot: str = "answer") -> StreamHandle:
+        with self._lock:
+            self._next_id += 1
+            handle = StreamHandle(self, self._next_id, chat, question, remember, slot)
+            previous = self._active.get(slot)
+            self._active[slot] = handle
+        if previous:
+            previous.cancel()
+        return handle
+
+    def promote(self, handle: StreamHandle, slot: str = "answer"):
+        """Move ``handle`` (e.g. a speculative stream) into ``slot``, superseding its owner."""
+        with self._lock:
+            if self._active.get(handle.slot) is handle:
+                del self._active[handle.slot]
+            previous = self._active.get(slot)
+            handle.slot = slot
+            self._active[slot] = handle
+        if previous and previous is not handle:
+            previous.cancel()
+
+    def is_current(self, handle: StreamHandle) -> bool:
+        with self._lock:
+            return self._active.get(handle.slot) is handle and not handle.cancelled
+
+    def cancel_all(self):
+        with self._lock:
+            handles = list(self._active.values())
+            self._active.clear()
+        for handle in handles:
+            handle.cancel()
+
+    def _release(self, handle: StreamHandle):
+        with self._lock:
+            if self._active.get(handle.slot) is handle:
+                del self._active[handle.slot]
+
+
+scheduler = StreamScheduler()
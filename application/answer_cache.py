@@ -0,0 +1,229 @@
+# answer_cache.py
+import os
+import re
+import json
+import atexit
+import math
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+ANSWER_CACHE_FILE = "answer_cache.json"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.85"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_DAYS", "14")) * 24 * 3600
+# Longer questions (typically screen captures) only match the exact same text:
+# two long prompts that differ in one number score as near-duplicates by words.
+ANSWER_CACHE_FUZZY_MAX_CHARS = int(os.getenv("ANSWER_CACHE_FUZZY_MAX_CHARS", "200"))
+# New answers are written to disk this long after the first unsaved one, so a
+# burst of answers costs a single write.
+ANSWER_CACHE_SAVE_DELAY = float(os.getenv("ANSWER_CACHE_SAVE_DELAY", "2"))
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+# Filler that shows up in spoken questions but does not change their meaning.
+_STOPWORDS = {
+    "a", "an", "the", "um", "uh", "so", "please", "could", "can", "would", "you",
+    "me", "us", "just", "okay", "ok", "well", "now", "then", "and", "to", "of",
+}
+
+
+def question_vector(question: str) -> Counter:
+    """Bag of words plus adjacent-word pairs, ignoring filler words."""
+    words = [w for w in _WORD_RE.findall((question or "").lower()) if w not in _STOPWORDS]
+    vector = Counter(words)
+    vector.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return vector
+
+
+def cosine_similarity(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b.get(term, 0) for term, count in a.items())
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def normalize_question(question: str) -> str:
+    """Case- and whitespace-insensitive text of ``question``; keeps digits and symbols."""
+    return " ".join((question or "").lower().split())
+
+
+def exact_key(question: str) -> str:
+    """Key of a question that must match verbatim (see ANSWER_CACHE_FUZZY_MAX_CHARS)."""
+    return "text:" + hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()
+
+
+def context_key(context: str) -> str:
+    """Short digest of the resume/system prompt the answers were generated for."""
+    return hashlib.sha256((context or "").encode("utf-8")).hexdigest()[:16]
+
+
+class AnswerCache:
+    """
+    Local cache of generated answers, matched by question similarity within the
+    same resume context; questions longer than ``fuzzy_max_chars`` must match
+    exactly (after normalize_question). Entries expire after ``ttl`` seconds
+    and the least recently used ones are evicted beyond ``max_entries``. The cache is saved to
+    ``path`` by a background writer ``save_delay`` seconds after a change, so
+    answering never waits on the disk; call flush() before exiting.
+    """
+
+    def __init__(self, path=ANSWER_CACHE_FILE, threshold=ANSWER_CACHE_THRESHOLD,
+                 max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL_SECONDS,
+                 save_delay=ANSWER_CACHE_SAVE_DELAY, fuzzy_max_chars=ANSWER_CACHE_FUZZY_MAX_CHARS):
+        self.path = path
+        self.threshold = threshold
+        self.fuzzy_max_chars = fuzzy_max_chars
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.save_delay = save_delay
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # id -> entry, least recently used first
+        self._vectors = {}
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._save_lock = threading.Lock()
+        self._writer = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print("[ANSWER CACHE] could not load cache:", e)
+            return
+        if not isinstance(entries, list):
+            print("[ANSWER CACHE] could not load cache: not a list of entries")
+            return
+        valid = [e for e in entries if self._valid_entry(e)]
+        if len(valid) < len(entries):
+            print(f"[ANSWER CACHE] skipped {len(entries) - len(valid)} malformed entries")
+        now = time.time()
+        for entry in sorted(valid, key=lambda e: e.get("last_used", e["created"])):
+            if now - entry["created"] <= self.ttl:
+                self._insert(entry)
+
+    @staticmethod
+    def _valid_entry(entry):
+        return (isinstance(entry, dict)
+                and all(isinstance(entry.get(k), str) for k in ("context", "question_key", "question", "answer"))
+                and isinstance(entry.get("created"), (int, float))
+                and isinstance(entry.get("last_used", 0), (int, float)))
+
+    def _save(self, entries):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print("[ANSWER CACHE] could not save cache:", e)
+
+    def _schedule_save(self):
+        self._dirty.set()
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run_writer, name="answer-cache-writer", daemon=True)
+            self._writer.start()
+
+    def _run_writer(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self.save_delay)
+            self.flush()
+
+    def flush(self):
+        """Write unsaved changes to ``path`` now."""
+        with self._save_lock:
+            if not self._dirty.is_set():
+                return
+            self._dirty.clear()
+            with self._lock:
+                entries = [dict(e) for e in self._entries.values()]
+            self._save(entries)
+
+    def _insert(self, entry):
+        entry_id = f"{entry['context']}:{entry['question_key']}"
+        self._entries[entry_id] = entry
+        self._entries.move_to_end(entry_id)
+        # Long questions only match exactly (older files may hold them under a fuzzy key)
+        if len(normalize_question(entry["question"])) <= self.fuzzy_max_chars:
+            self._vectors[entry_id] = question_vector(entry["question"])
+        while len(self._entries) > self.max_entries:
+            old_id, _ = self._entries.popitem(last=False)
+            self._vectors.pop(old_id, None)
+
+    def _question_key(self, question):
+        if len(normalize_question(question)) > self.fuzzy_max_chars:
+            return exact_key(question)
+        return " ".join(sorted(question_vector(question)))
+
+    def lookup(self, context: str, question: str):
+        """Return the cached answer closest to ``question`` or None."""
+        ctx = context_key(context)
+        question_key = self._question_key(question)
+        if question_key.startswith("text:"):
+            return self._lookup_exact(f"{ctx}:{question_key}", question)
+        vector = question_vector(question)
+        now = time.time()
+        with self._lock:
+            best_id, best_score = None, 0.0
+            for entry_id, entry in list(self._entries.items()):
+                if now - entry["created"] > self.ttl:
+                    del self._entries[entry_id]
+                    self._vectors.pop(entry_id, None)
+                    continue
+                if entry["context"] != ctx or entry_id not in self._vectors:
+                    continue
+                score = cosine_similarity(vector, self._vectors[entry_id])
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry = self._entries[best_id]
+            entry["last_used"] = now
+            self._entries.move_to_end(best_id)
+            print(f"[ANSWER CACHE] hit ({best_score:.2f}) for: {question}")
+            return entry["answer"]
+
+    def _lookup_exact(self, entry_id, question):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is not None and now - entry["created"] > self.ttl:
+                del self._entries[entry_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["last_used"] = now
+            self._entries.move_to_end(entry_id)
+            print(f"[ANSWER CACHE] exact hit for: {question[:80]}")
+            return entry["answer"]
+
+    def put(self, context: str, question: str, answer: str):
+        if not question or not answer:
+            return
+        now = time.time()
+        entry = {
+            "context": context_key(context),
+            "question_key": self._question_key(question),
+            "question": question,
+            "answer": answer,
+            "created": now,
+            "last_used": now,
+        }
+        with self._lock:
+            self._insert(entry)
+            self._schedule_save()
+
+
+answer_cache = AnswerCache()
+atexit.register(answer_cache.flush)
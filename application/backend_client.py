@@ -0,0 +1,183 @@
+# backend_client.py
+import json
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+DEPLOYED_API_BASE = "https://se-project-backend-ddr9.onrender.com"
+API_BASE = "http://localhost:8000"
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 8)
+
+
+def token_owner(token):
+    """
+    Non-reversible id of the account a JWT was issued to (hash of its ``sub``),
+    for keeping one user's local data apart from the next. The signature is not
+    checked; None when the token cannot be read.
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        subject = claims["sub"]
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+    return hashlib.sha256(str(subject).encode("utf-8")).hexdigest()[:16]
+
+
+class BackendClient:
+    """
+    One keep-alive session for every backend call made by the desktop app.
+
+    Connection errors are retried with backoff for all methods (nothing reached
+    the server yet); 502/503/504 responses are only retried for idempotent
+    requests so a charge is never sent twice.
+    """
+
+    def __init__(self, base_url=API_BASE, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=1,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="backend")
+
+    @staticmethod
+    def auth_headers(token):
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def request(self, method, path, token=None, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        headers = self.auth_headers(token)
+        headers.update(kwargs.pop("headers", {}))
+        return self.session.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+
+    def login(self, username, password):
+        return self.request("POST", "/auth/login", data={"username": username, "password": password})
+
+    def get_credits(self, token):
+        """Current balance, or None if the backend could not be reached."""
+        r = self.request("GET", "/credits/balance", token=token)
+        if r.status_code == 200:
+            return r.json().get("credits", 0)
+        return None
+
+    def deduct_and_log(self, token, question, answer, tokens_used):
+        if tokens_used > 0:
+            self.request("POST", "/credits/deduct", token=token, json={"amount": tokens_used})
+        return self.log_response(token, question, answer, tokens_used)
+
+    def charge_and_log(self, token, question, answer, tokens_used, reservation_id=None):
+        """
+        Charge and log an answer in one request (POST /responses/charge).
+        Returns the new balance, or None if it is unknown.
+        """
+        payload = {"query": question, "ai_response": answer, "tokens_used": tokens_used,
+                   "reservation_id": reservation_id}
+        r = self.request("POST", "/responses/charge", token=token, json=payload)
+        if r.status_code == 200:
+            return r.json().get("balance")
+        if r.status_code in (404, 405):
+            # Backend predates /responses/charge
+            if reservation_id is not None:
+                self.settle_reservation(token, reservation_id, tokens_used)
+                self.log_response(token, question, answer, tokens_used)
+            else:
+                self.deduct_and_log(token, question, answer, tokens_used)
+        return None
+
+    def reserve_credits(self, token, amount):
+        return self.request("POST", "/credits/reserve", token=token, json={"amount": amount})
+
+    def settle_reservation(self, token, reservation_id, amount):
+        return self.request("POST", f"/credits/reservations/{reservation_id}/settle",
+                            token=token, json={"amount": amount})
+
+    def release_reservation(self, token, reservation_id):
+        return self.request("POST", f"/credits/reservations/{reservation_id}/release", token=token)
+
+    def log_response(self, token, question, answer, tokens_used):
+        payload = {"query": question, "ai_response": answer, "tokens_used": tokens_used}
+        return self.request("POST", "/responses/", token=token, json=payload)
+
+    def log_transcription(self, token, text):
+        return self.request("POST", "/transcriptions/", token=token, json={"transcript_text": text})
+
+    def log_transcriptions(self, token, items):
+        """Bulk-log ``[{"transcript_text": ...}, ...]`` in one request."""
+        return self.request("POST", "/transcriptions/batch", token=token, json={"transcripts": items})
+
+    def submit(self, fn, *args, **kwargs):
+        """Run ``fn`` on the client's background pool (for non-Qt callers)."""
+        return self._executor.submit(fn, *args, **kwargs)
+
+
+class _CallSignals(QObject):
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class BackendCall(QRunnable):
+    """Runs a blocking backend call on the Qt thread pool and reports back via signals."""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _CallSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.succeeded.emit(result)
+
+
+_pending_calls = set()
+_pending_lock = threading.Lock()
+
+
+def _release(call):
+    with _pending_lock:
+        _pending_calls.discard(call)
+
+
+def run_async(fn, *args, on_success=None, on_error=None, **kwargs):
+    """
+    Call ``fn(*args, **kwargs)`` off the UI thread. ``on_success(result)`` or
+    ``on_error(exception)`` are delivered back on the thread that made the call.
+    """
+    call = BackendCall(fn, *args, **kwargs)
+    if on_success:
+        call.signals.succeeded.connect(on_success)
+    if on_error:
+        call.signals.failed.connect(on_error)
+    # Keep the Python wrapper (and its signals) alive until the result is delivered
+    call.signals.succeeded.connect(lambda _: _release(call))
+    call.signals.failed.connect(lambda _: _release(call))
+    with _pending_lock:
+        _pending_calls.add(call)
+    QThreadPool.globalInstance().start(call)
+    return call
+
+
+client = BackendClient()
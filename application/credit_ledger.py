@@ -0,0 +1,200 @@
+# credit_ledger.py
+import threading
+
+from backend_client import client
+
+# Credits held on the backend while an answer streams. Most answers cost 1-3
+# credits (1 per 100 words); anything beyond the hold is charged at settle time.
+# A smaller balance is held in full instead, so any balance > 0 can answer.
+PREAUTH_CREDITS = 3
+
+
+class Authorization:
+    """A locally approved answer whose backend reservation may still be in flight."""
+
+    def __init__(self, ledger, token, amount, generation):
+        self.ledger = ledger
+        self.token = token
+        self.amount = amount
+        self.generation = generation
+        self.reservation_id = None
+        self.rejected = False
+        self.future = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def on_rejected(self, callback):
+        """Call ``callback`` if the backend refuses the hold (now, if it already has)."""
+        with self._lock:
+            if not self.rejected:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def _reject(self):
+        with self._lock:
+            self.rejected = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print("[LEDGER CALLBACK ERROR]", e)
+
+
+class CreditLedger:
+    """
+    Client-side view of the user's balance.
+
+    Answers are pre-authorized against the cached balance so the first token is
+    never gated on the network. The hold is placed on the backend in the
+    background (POST /credits/reserve) and settled or released afterwards; the
+    cached balance is reconciled from every backend reply.
+
+    reset() starts over for a new account. Replies to requests made before it
+    carry an older ``generation`` and are ignored, so they cannot leak the
+    previous account's balance into the new one.
+    """
+
+    def __init__(self):
+        self.balance = None
+        self.pending = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget the cached balance and pending holds (logout, login, account switch)."""
+        with self._lock:
+            self.balance = None
+            self.pending = 0
+            self.generation += 1
+
+    def _set_balance(self, balance, generation):
+        with self._lock:
+            if generation == self.generation:
+                self.balance = balance
+
+    def refresh(self, token):
+        generation = self.generation
+        try:
+            credits = client.get_credits(token)
+        except Exception as e:
+            print("[LEDGER REFRESH ERROR]", e)
+            return self.balance
+        if credits is not None:
+            self._set_balance(credits, generation)
+        return credits
+
+    def refresh_async(self, token):
+        return client.submit(self.refresh, token)
+
+    def available(self):
+        with self._lock:
+            if self.balance is None:
+                return None
+            return self.balance - self.pending
+
+    def record_charge(self, amount, balance=None, generation=None):
+        """
+        Apply a charge to the cached balance, or take the backend's balance when
+        known. ``generation`` is the ledger's when the charge was made.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if balance is not None:
+                self.balance = balance
+            elif self.balance is not None:
+                self.balance = max(0, self.balance - amount)
+
+    def preauthorize(self, token, amount=PREAUTH_CREDITS):
+        """
+        Approve an answer locally. Returns an Authorization, or None when the
+        cached balance is already exhausted. An unknown balance is approved
+        optimistically; the backend reservation is the final word.
+        """
+        with self._lock:
+            if self.balance is not None:
+                available = self.balance - self.pending
+                if available <= 0:
+                    return None
+                amount = min(amount, available)
+            self.pending += amount
+            generation = self.generation
+        auth = Authorization(self, token, amount, generation)
+        auth.future = client.submit(self._reserve, auth)
+        return auth
+
+    def _reserve(self, auth):
+        pending = auth.amount  # what preauthorize added to self.pending
+        try:
+            while True:
+                r = client.reserve_credits(auth.token, auth.amount)
+                if r.status_code != 400:
+                    break
+                # The cached balance was stale: re-read it and hold what is left.
+                balance = client.get_credits(auth.token)
+                if balance is not None:
+                    self._set_balance(balance, auth.generation)
+                if not balance or balance >= auth.amount:
+                    break
+                auth.amount = balance
+        except Exception as e:
+            # Backend unreachable: keep the answer and charge it at settle time.
+            print("[LEDGER RESERVE ERROR]", e)
+            self._clear_pending(auth, pending)
+            return
+        if r.status_code == 200:
+            data = r.json()
+            auth.reservation_id = data["id"]
+            self._clear_pending(auth, pending, balance=data.get("balance"))
+        elif r.status_code == 400:
+            self._clear_pending(auth, pending)
+            auth._reject()
+        else:
+            # Older backend without reservations; fall back to charging afterwards.
+            self._clear_pending(auth, pending)
+
+    def _clear_pending(self, auth, amount, balance=None):
+        with self._lock:
+            if auth.generation != self.generation:
+                return  # reset() already dropped this hold
+            self.pending = max(0, self.pending - amount)
+            if balance is not None:
+                self.balance = balance
+
+    def settle(self, auth, question, answer, tokens_used, done_callback=None):
+        """Charge ``tokens_used`` against the hold and log the answer, in the background."""
+        def _settle():
+            try:
+                balance = client.charge_and_log(auth.token, question, answer, tokens_used,
+                                                reservation_id=auth.reservation_id)
+                self.record_charge(tokens_used, balance, generation=auth.generation)
+            except Exception as e:
+                print("[LEDGER SETTLE ERROR]", e)
+            finally:
+                if done_callback:
+                    done_callback()
+        self._after_reservation(auth, _settle)
+
+    def release(self, auth):
+        """Return the hold of an answer that produced nothing billable."""
+        def _release():
+            if auth.reservation_id is None:
+                return
+            try:
+                r = client.release_reservation(auth.token, auth.reservation_id)
+                if r.status_code == 200:
+                    balance = r.json().get("balance")
+                    if balance is not None:
+                        self._set_balance(balance, auth.generation)
+            except Exception as e:
+                print("[LEDGER RELEASE ERROR]", e)
+        self._after_reservation(auth, _release)
+
+    def _after_reservation(self, auth, fn):
+        # Chain on the reservation instead of blocking a pool worker on it.
+        auth.future.add_done_callback(lambda _: client.submit(fn))
+
+
+ledger = CreditLedger()
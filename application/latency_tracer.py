@@ -0,0 +1,163 @@
+# latency_tracer.py
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+from ai_engine import count_tokens
+
+TRACE_FILE = "latency_trace.jsonl"
+TRACE_MAX_BYTES = 1024 * 1024
+TRACE_BACKUPS = 3
+
+# Pipeline stages in the order they normally happen. Every offset is measured
+# in milliseconds from the moment the question was finalized.
+STAGES = (
+    "question_finalized",
+    "credit_check",
+    "llm_request",
+    "first_chunk",
+    "last_chunk",
+    "overlay_render",
+    "backend_log",
+)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; returns None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class QuestionTrace:
+    """Timestamps for a single question as it moves through the answer pipeline."""
+
+    def __init__(self, tracer, source, question):
+        self.tracer = tracer
+        self.source = source
+        self.question = question
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self._t0 = time.perf_counter()
+        self.marks = {"question_finalized": 0.0}
+        self.answer_chars = 0
+        self.answer_tokens = 0
+        self.finished = False
+
+    def _now_ms(self):
+        return round((time.perf_counter() - self._t0) * 1000, 1)
+
+    def mark(self, stage):
+        """Record ``stage`` once; later calls for the same stage are ignored."""
+        if stage not in self.marks:
+            self.marks[stage] = self._now_ms()
+
+    def chunk(self, text):
+        """Record a streamed answer chunk."""
+        now = self._now_ms()
+        self.marks.setdefault("first_chunk", now)
+        self.marks["last_chunk"] = now
+        self.answer_chars += len(text)
+        self.answer_tokens += count_tokens(text)
+
+    def to_record(self, status):
+        record = {
+            "started_at": self.started_at,
+            "source": self.source,
+            "question": self.question[:200],
+            "status": status,
+            "marks_ms": self.marks,
+            "answer_chars": self.answer_chars,
+            "answer_tokens": self.answer_tokens,
+        }
+        if "llm_request" in self.marks and "first_chunk" in self.marks:
+            record["ttft_ms"] = round(self.marks["first_chunk"] - self.marks["llm_request"], 1)
+        stream_ms = self.marks.get("last_chunk", 0) - self.marks.get("first_chunk", 0)
+        if stream_ms > 0:
+            record["tokens_per_sec"] = round(self.answer_tokens / (stream_ms / 1000.0), 1)
+        return record
+
+    def finish(self, status="ok"):
+        if self.finished:
+            return
+        self.finished = True
+        self.tracer._finish(self, status)
+
+
+class LatencyTracer:
+    """
+    Collects per-question stage timings, appends them to a rotating JSONL file
+    and keeps the current session in memory for the p50/p95 summary.
+    """
+
+    def __init__(self, path=TRACE_FILE, max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.records = []
+        self._active = None
+        self._lock = threading.Lock()
+
+    def start(self, source, question):
+        trace = QuestionTrace(self, source, question)
+        with self._lock:
+            self._active = trace
+        return trace
+
+    def mark_render(self):
+        """Called by the overlay when it paints answer text for the active question."""
+        with self._lock:
+            trace = self._active
+        if trace and not trace.finished and "first_chunk" in trace.marks:
+            trace.mark("overlay_render")
+
+    def _finish(self, trace, status):
+        record = trace.to_record(status)
+        with self._lock:
+            if self._active is trace:
+                self._active = None
+            self.records.append(record)
+            try:
+                self._rotate_if_needed()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                print("[TRACE ERROR]", e)
+
+    def _rotate_if_needed(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def summary(self):
+        """p50/p95 (ms) for every stage plus TTFT and tokens/sec for this session."""
+        with self._lock:
+            records = list(self.records)
+        result = {"questions": len(records)}
+        for stage in STAGES[1:]:
+            values = [r["marks_ms"][stage] for r in records if stage in r["marks_ms"]]
+            result[stage] = (percentile(values, 50), percentile(values, 95))
+        for key in ("ttft_ms", "tokens_per_sec"):
+            values = [r[key] for r in records if key in r]
+            result[key] = (percentile(values, 50), percentile(values, 95))
+        return result
+
+    def print_summary(self):
+        stats = self.summary()
+        if not stats["questions"]:
+            return
+        print(f"[LATENCY] {stats['questions']} question(s) this session (p50 / p95)")
+        for key, (p50, p95) in stats.items():
+            if key == "questions" or p50 is None:
+                continue
+            print(f"[LATENCY]   {key:<18} {p50:>9} / {p95}")
+
+
+tracer = LatencyTracer()
@@ -1,5 +1,5 @@
 # launcher_ui.py
-import os, json, requests
+import os, json, requests, threading
 from dotenv import load_dotenv
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QFileDialog, QLabel,
@@ -11,9 +11,11 @@ from PyQt5.QtGui import QFont, QColor, QIcon, QPixmap, QPainter, QBrush, QLinear
 from PyQt5.QtWidgets import QGraphicsDropShadowEffect, QGraphicsOpacityEffect
 
 # Internal imports
-from resume_parser import get_resume_summary
+from resume_parser import get_resume_summary, ResumeProcessingCancelled
 from ai_engine import configure_google_ai, build_chat
 from speech_api1 import get_audio_devices
+from backend_client import client, run_async
+from credit_ledger import ledger
 
 # Load environment keys
 load_dotenv()
@@ -21,8 +23,6 @@ GEMINI_KEY = os.getenv("gemini_llm")
 ASSEMBLY_KEY = os.getenv("assembly_api_key")
 OCR_API_KEY = os.getenv("ocr")
 
-DEPLOYED_API_BASE = "https://se-project-backend-ddr9.onrender.com"
-API_BASE="http://localhost:8000"
 TOKEN_FILE = "token.json"
 
 
@@ -34,6 +34,37 @@ def save_token_local(token: str):
         pass
 
 
+class ResumeWorker(QThread):
+    """Reads, extracts and summarizes a resume off the Qt main thread."""
+    progress = pyqtSignal(str, str)     # stage, detail
+    partial = pyqtSignal(str)           # summary streamed so far
+    succeeded = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            summary = get_resume_summary(
+                self.path,
+                progress=self.progress.emit,
+                on_partial=self.partial.emit,
+                cancel_event=self._cancel_event,
+            )
+            self.succeeded.emit(summary)
+        except ResumeProcessingCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
 class LauncherWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -54,6 +85,7 @@ class LauncherWindow(QWidget):
         self.login_error_label = None
         self.login_spinner = None
         self.resume_spinner = None
+        self.resume_worker = None
 
         self.init_ui()
         self.setup_animations()
@@ -717,17 +749,22 @@ class LauncherWindow(QWidget):
         self.login_btn.hide()
         self.login_spinner.show()
         
-        # Use QTimer to allow UI to update before making request
         print("Starting login process...")  # Debug print
-        QTimer.singleShot(100, lambda: self._perform_login(username, password))
+        self._perform_login(username, password)
     
     def _perform_login(self, username, password):
         print(f"Performing login for: {username}")  # Debug print
+        # Ensure dashboard frame is built and ready
+        if not hasattr(self, 'dashboard_frame'):
+            self.build_dashboard_frame()
+        run_async(
+            client.login, username, password,
+            on_success=lambda r: self._on_login_response(username, r),
+            on_error=self._on_login_error,
+        )
+
+    def _on_login_response(self, username, r):
         try:
-            # Ensure dashboard frame is built and ready
-            if not hasattr(self, 'dashboard_frame'):
-                self.build_dashboard_frame()
-            r = requests.post(f"{API_BASE}/auth/login", data={"username": username, "password": password}, timeout=8)
             if r.status_code == 200:
                 token = r.json().get("access_token")
                 if not token:
@@ -735,6 +772,7 @@ class LauncherWindow(QWidget):
                     return
                 app = QApplication.instance()
                 app._backend_token = token
+                ledger.reset()
                 save_token_local(token)
                 self.welcome_label.setText(f"Welcome, {username}")
                 # Smooth transition to dashboard
@@ -749,16 +787,24 @@ class LauncherWindow(QWidget):
                 except:
                     pass
                 self.show_login_error(error_msg)
-        except requests.exceptions.Timeout:
-            self.show_login_error("Connection timeout. Please try again.")
-        except requests.exceptions.ConnectionError:
-            self.show_login_error("Cannot connect to server. Please check your connection.")
         except Exception as e:
             self.show_login_error(f"Login error: {str(e)}")
         finally:
-            # Hide spinner, show button
-            self.login_spinner.hide()
-            self.login_btn.show()
+            self._reset_login_button()
+
+    def _on_login_error(self, e):
+        if isinstance(e, requests.exceptions.Timeout):
+            self.show_login_error("Connection timeout. Please try again.")
+        elif isinstance(e, requests.exceptions.ConnectionError):
+            self.show_login_error("Cannot connect to server. Please check your connection.")
+        else:
+            self.show_login_error(f"Login error: {str(e)}")
+        self._reset_login_button()
+
+    def _reset_login_button(self):
+        # Hide spinner, show button
+        self.login_spinner.hide()
+        self.login_btn.show()
     
     def show_login_error(self, message):
         self.login_error_label.setText(message)
@@ -785,6 +831,7 @@ class LauncherWindow(QWidget):
         if confirm == QMessageBox.Yes:
             app = QApplication.instance()
             app._backend_token = None
+            ledger.reset()
             try:
                 if os.path.exists(TOKEN_FILE): os.remove(TOKEN_FILE)
             except Exception: pass
@@ -812,17 +859,26 @@ class LauncherWindow(QWidget):
         if not token:
             self.credits_label.setText("Credits: —")
             return
-        try:
-            r = requests.get(f"{API_BASE}/credits/balance", headers={"Authorization": f"Bearer {token}"}, timeout=6)
-            if r.status_code == 200:
-                c = r.json().get("credits", 0)
-                self.credits_label.setText(f"Credits: {c}")
-            else:
-                self.credits_label.setText("Credits: error")
-        except:
+        self.credits_label.setText("Credits: ...")
+        run_async(
+            client.get_credits, token,
+            on_success=self._on_credits_loaded,
+            on_error=lambda e: self.credits_label.setText("Credits: error"),
+        )
+
+    def _on_credits_loaded(self, credits):
+        if credits is None:
             self.credits_label.setText("Credits: error")
+        else:
+            self.credits_label.setText(f"Credits: {credits}")
 
     def load_resume(self):
+        # While a resume is processing the same button cancels it
+        if self.resume_worker is not None:
+            self.resume_worker.cancel()
+            self.resume_status.setText("Cancelling...")
+            self.resume_btn.setEnabled(False)
+            return
         path, _ = QFileDialog.getOpenFileName(self, "Select Resume PDF", "", "PDF Files (*.pdf)")
         if path:
             self.resume_path = path
@@ -831,37 +887,65 @@ class LauncherWindow(QWidget):
             # Show spinner and update status
             self.resume_status.setText(f"Processing {filename}...")
             self.resume_spinner.show()
-            self.resume_btn.setEnabled(False)
+            self.resume_btn.setText("Cancel")
             
-            # Use QTimer to allow UI to update
-            QTimer.singleShot(100, lambda: self._process_resume(path, filename))
+            worker = ResumeWorker(path, self)
+            worker.progress.connect(lambda stage, detail: self._on_resume_progress(filename, stage, detail))
+            worker.partial.connect(lambda text: self._on_resume_partial(filename, text))
+            worker.succeeded.connect(lambda summary: self._on_resume_done(filename, summary))
+            worker.failed.connect(lambda error: self._on_resume_failed(filename, error))
+            worker.cancelled.connect(lambda: self._on_resume_cancelled(filename))
+            worker.finished.connect(self._on_resume_worker_finished)
+            worker.finished.connect(worker.deleteLater)
+            self.resume_worker = worker
+            worker.start()
     
-    def _process_resume(self, path, filename):
-        try:
-            summary = get_resume_summary(path)
-            self.resume_summary = summary
-            
-            # Show success with checkmark
-            self.resume_status.setText(f" {filename} uploaded")
-            self.resume_status.setStyleSheet("""
-                color:rgba(30, 32, 34, 0.5) ;
-                font-weight: 400;
-                font-size: 15px;
-                font-style: normal;
-            """)
-        except Exception as e:
-            # Show error
-            self.resume_status.setText(f"❌ Failed to process {filename}")
-            self.resume_status.setStyleSheet("""
-                color: #ff9b9b;
-                font-style: italic;
-                font-size: 12px;
-            """)
-            QMessageBox.critical(self, "Resume Error", f"Failed to summarize resume: {e}")
-        finally:
-            # Hide spinner and re-enable button
-            self.resume_spinner.hide()
-            self.resume_btn.setEnabled(True)
+    def _on_resume_progress(self, filename, stage, detail):
+        labels = {
+            "read": f"Reading {filename}...",
+            "extract": f"Extracting text from {filename} ({detail})...",
+            "summarize": f"Summarizing {filename}...",
+        }
+        self.resume_status.setText(labels.get(stage, f"Processing {filename}..."))
+
+    def _on_resume_partial(self, filename, text):
+        preview = " ".join(text.split())
+        if len(preview) > 70:
+            preview = "..." + preview[-70:]
+        self.resume_status.setText(f"Summarizing {filename}: {preview}")
+
+    def _on_resume_done(self, filename, summary):
+        self.resume_summary = summary
+        
+        # Show success with checkmark
+        self.resume_status.setText(f" {filename} uploaded")
+        self.resume_status.setStyleSheet("""
+            color:rgba(30, 32, 34, 0.5) ;
+            font-weight: 400;
+            font-size: 15px;
+            font-style: normal;
+        """)
+
+    def _on_resume_failed(self, filename, error):
+        # Show error
+        self.resume_status.setText(f"❌ Failed to process {filename}")
+        self.resume_status.setStyleSheet("""
+            color: #ff9b9b;
+            font-style: italic;
+            font-size: 12px;
+        """)
+        QMessageBox.critical(self, "Resume Error", f"Failed to summarize resume: {error}")
+
+    def _on_resume_cancelled(self, filename):
+        self.resume_path = None
+        self.resume_status.setText(f"Cancelled processing {filename}")
+
+    def _on_resume_worker_finished(self):
+        # Hide spinner and re-enable button
+        self.resume_worker = None
+        self.resume_spinner.hide()
+        self.resume_btn.setText("Select PDF")
+        self.resume_btn.setEnabled(True)
 
     def start_assistant(self):
         if not self.resume_summary:
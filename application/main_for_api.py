@@ -1,13 +1,21 @@
 # main_for_api.py
-import os, threading, requests, json
+import os, threading, requests, json, multiprocessing, time
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from dotenv import load_dotenv
 import sys
 # Import the enhanced UI components
 from launcher_ui import LauncherWindow
-from overlay_ui2 import FloatingOverlay, show_overlay  # keep as-is; file must exist
-from ai_engine import get_response_from_chat_stream, estimate_tokens
-from speech_api1 import start_transcription_thread, set_backend_token
+from overlay_ui2 import FloatingOverlay, show_overlay, set_active_request, get_active_request, pump_stats  # keep as-is; file must exist
+from overlay_events import QuestionSet, AnswerStarted, AnswerDelta, AnswerDone, AnswerError
+from ai_engine import scheduler, estimate_tokens
+from speech_api1 import start_transcription_thread, set_backend_token, stop_transcript_shipper
+from latency_tracer import tracer
+from speculative import Speculator, SPECULATIVE_ENABLED
+from answer_cache import answer_cache
+from backend_client import client
+from credit_ledger import ledger
+from ocr_image import prepare_for_ocr, OCR_MAX_UPLOAD_BYTES
+from screen_capture import capturer, CAPTURE_HIDE_DELAY_MS
 
 # =========================
 # Load ENV
@@ -21,16 +29,17 @@ OCR_API_KEY = os.getenv("ocr")
 # =========================
 # Backend config
 # =========================
-DEPLOYED_API_BASE = "https://se-project-backend-ddr9.onrender.com"
-API_BASE="http://localhost:8000"
 TOKEN_FILE = "token.json"
 
 stop_event = threading.Event()
 chat = None
 transcription_thread = None
 overlay_window = None
+speculator = None
 latest_transcript = ""
 END_UTTERANCE_TIMEOUT = 2.0
+# Answers served from the local cache cost no Gemini tokens, so they are not billed.
+CACHE_HIT_TOKENS = 0
 
 # =========================
 # Backend helpers
@@ -46,67 +55,70 @@ def load_token():
 
 def backend_get_credits(token):
     try:
-        r = requests.get(f"{API_BASE}/credits/balance", headers={"Authorization": f"Bearer {token}"}, timeout=6)
-        if r.status_code == 200:
-            return r.json().get("credits", 0)
+        credits = client.get_credits(token)
+        if credits is not None:
+            return credits
     except Exception as e:
         print("[CREDITS ERROR]", e)
     return 0
 
-def backend_deduct_and_log(token, question, answer, tokens_used=None):
-    if tokens_used is None:
+def backend_deduct_and_log(token, question, answer, tokens_used=None, cached=False, generation=None):
+    if cached:
+        tokens_used = CACHE_HIT_TOKENS
+    elif tokens_used is None:
         tokens_used = estimate_tokens(answer)
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
     try:
-        requests.post(f"{API_BASE}/credits/deduct", headers=headers, json={"amount": tokens_used}, timeout=8)
-        payload = {"query": question, "ai_response": answer, "tokens_used": tokens_used}
-        requests.post(f"{API_BASE}/responses/", headers=headers, json=payload, timeout=8)
+        balance = client.charge_and_log(token, question, answer, tokens_used)
+        ledger.record_charge(tokens_used, balance, generation=generation)
     except Exception as e:
         print("[CREDIT/LOG ERROR]", e)
 
+def backend_deduct_and_log_async(token, question, answer, trace=None, **kwargs):
+    """Charge and log on the backend client's pool so the answer path never waits on it."""
+    kwargs.setdefault("generation", ledger.generation)
+    future = client.submit(backend_deduct_and_log, token, question, answer, **kwargs)
+    if trace:
+        def _logged(_):
+            trace.mark("backend_log")
+            trace.finish()
+        future.add_done_callback(_logged)
+    return future
+
 # =========================
 # OCR / AI pipeline
 # =========================
 def get_answer_from_screen():
     global overlay_window
-    def do_capture():
-        screenshot_path = "screenshot.png"
+    def do_capture(timings=None):
         try:
-            # Capture the screen using PyQt5
-            from PyQt5.QtWidgets import QApplication
-            from PyQt5.QtGui import QPixmap
-            
-            app = QApplication.instance()
-            screen = app.primaryScreen()
-            if screen:
-                # Capture the entire screen
-                screenshot = screen.grabWindow(0)
-                # Save the screenshot
-                screenshot.save(screenshot_path, 'PNG')
-                print(f"Screenshot captured and saved to {screenshot_path}")
-            else:
-                raise Exception("Could not access screen for capture")
+            capture = capturer.capture(timings)
+            print(f"[CAPTURE] {capture.describe()}")
         except Exception as e:
             print(f"Error capturing screenshot: {e}")
-            if overlay_window:
-                overlay_window.show()
-            show_overlay('answer', f"Screenshot error: {e}")
+            show_overlay(AnswerError(f"Screenshot error: {e}"))
             return
         finally:
-            if overlay_window:
+            if overlay_window and not overlay_window.isVisible():
                 overlay_window.show()
-        threading.Thread(target=process_captured_image, args=(screenshot_path,), daemon=True).start()
-    if overlay_window:
+        threading.Thread(target=process_captured_image, args=(capture.image,), daemon=True).start()
+    if overlay_window and not overlay_window.capture_excluded:
+        # The overlay would appear in the screenshot: hide it and give the
+        # compositor time to repaint the screen underneath.
         overlay_window.hide()
+        hidden_at = time.perf_counter()
         from PyQt5.QtCore import QTimer
-        QTimer.singleShot(250, do_capture)
+        QTimer.singleShot(CAPTURE_HIDE_DELAY_MS, lambda: do_capture(
+            {"hide_wait": round((time.perf_counter() - hidden_at) * 1000, 1)}))
+    else:
+        # Excluded from capture (or no overlay): grab right away
+        do_capture()
 
-def process_captured_image(image_path):
+def process_captured_image(screenshot):
     global chat
     
     def reset_ui_state():
         # Reset the UI state
-        show_overlay('question', "🎤 Listening...")
+        show_overlay(QuestionSet("🎤 Listening..."))
         if overlay_window:
             overlay_window.process_button.setEnabled(True)
             overlay_window.process_button.setCursor(overlay_window.PointingHandCursor)
@@ -115,28 +127,26 @@ def process_captured_image(image_path):
     
     try:
         # Validate input
-        if not image_path or not os.path.exists(image_path):
-            show_overlay('answer', "❌ Error: Screenshot file not found. Please try capturing the screen again.")
+        if screenshot is None:
+            show_overlay(AnswerError("❌ Error: No screenshot was captured. Please try capturing the screen again."))
             reset_ui_state()
             return
             
         if not OCR_API_KEY or not OCR_API_KEY.strip():
-            show_overlay('answer', "❌ Error: OCR API key is not configured\nPlease check your .env file and restart the application")
+            show_overlay(AnswerError("❌ Error: OCR API key is not configured\nPlease check your .env file and restart the application"))
             reset_ui_state()
             return
         
-        # Verify the image file is valid
-        try:
-            file_size = os.path.getsize(image_path)
-            if file_size == 0:
-                raise ValueError("Screenshot file is empty (0 bytes)")
-            if file_size > 10 * 1024 * 1024:  # 10MB limit
-                raise ValueError("Screenshot file is too large (max 10MB)")
-        except OSError as e:
-            raise Exception(f"Error accessing screenshot file: {str(e)}")
+        show_overlay(QuestionSet("🔍 Processing screenshot..."))
+        show_overlay(AnswerStarted(placeholder="Processing image, please wait..."))
         
-        show_overlay('question', "🔍 Processing screenshot...")
-        show_overlay('answer', "Processing image, please wait...")
+        # Grayscale, downscale and compress in memory before upload
+        image = prepare_for_ocr(screenshot)
+        print(f"[OCR] {image.describe()}")
+        if not image.data:
+            raise ValueError("Screenshot is empty (0 bytes)")
+        if len(image.data) > OCR_MAX_UPLOAD_BYTES:
+            raise ValueError("Screenshot is too large (max 10MB)")
         
         # Prepare the OCR request with additional parameters for better accuracy
         payload = {
@@ -153,14 +163,16 @@ def process_captured_image(image_path):
         
         # Send the request to OCR.space with better error handling
         try:
-            with open(image_path, 'rb') as f:
-                files = {'file': (os.path.basename(image_path), f, 'image/png')}
-                response = requests.post(
-                    "https://api.ocr.space/parse/image",
-                    files=files,
-                    data=payload,
-                    timeout=45  # Increased timeout for better reliability
-                )
+            files = {'file': ('screenshot.png', image.data, 'image/png')}
+            ocr_started = time.perf_counter()
+            response = requests.post(
+                "https://api.ocr.space/parse/image",
+                files=files,
+                data=payload,
+                timeout=45  # Increased timeout for better reliability
+            )
+            print(f"[OCR] {len(image.data) / 1024:.0f} KB uploaded, response in "
+                  f"{(time.perf_counter() - ocr_started) * 1000:.0f} ms")
         except requests.exceptions.Timeout:
             raise Exception("OCR service timed out. The server took too long to respond.")
         except requests.exceptions.RequestException as e:
@@ -212,72 +224,155 @@ def process_captured_image(image_path):
             extracted = extracted[:2000] + "... [text truncated]"
         
         # Show the extracted text and get AI response
-        show_overlay('question', extracted)
+        show_overlay(QuestionSet(extracted))
         question = f"Screen Question: {extracted}"
+        trace = tracer.start("screen", question)
         
         # Get AI response with error handling
         try:
             full_resp = ""
-            response_stream = get_response_from_chat_stream(chat, question) if chat else ["AI service not available"]
+            cached = answer_cache.lookup(chat[1].system_prompt, question) if chat else None
+            if cached:
+                trace.mark("cache_hit")
+                answer_from_cache(question, extracted, cached, trace)
+                return
+            trace.mark("llm_request")
+            handle = scheduler.start(chat, question) if chat else None
+            request_id = handle.request_id if handle else None
+            set_active_request(request_id)
+            show_overlay(AnswerStarted(extracted, request_id))
+            response_stream = handle if handle else ["AI service not available"]
             for chunk in response_stream:
+                trace.chunk(chunk)
                 full_resp += chunk
-                show_overlay('answer', f"Q: {extracted}\n\nA: {full_resp}")
+                show_overlay(AnswerDelta(chunk, request_id))
+            show_overlay(AnswerDone(request_id))
+            if handle and handle.cancelled:
+                trace.finish("superseded")
+            elif handle and full_resp:
+                answer_cache.put(chat[1].system_prompt, question, full_resp)
             
             # Log the interaction if user is authenticated
             token = getattr(QApplication.instance(), '_backend_token', None)
-            if token:
-                try:
-                    backend_deduct_and_log(token, question, full_resp)
-                except Exception as e:
-                    print(f"[LOGGING ERROR] {e}")
+            if token and full_resp:
+                backend_deduct_and_log_async(token, question, full_resp, trace)
+            else:
+                trace.finish()
         except Exception as e:
-            show_overlay('answer', f"❌ Error getting AI response: {str(e)}\nThe text was extracted successfully: \n\n{extracted}")
+            trace.finish("error")
+            show_overlay(AnswerError(f"❌ Error getting AI response: {str(e)}\nThe text was extracted successfully: \n\n{extracted}"))
             return
                 
     except requests.exceptions.RequestException as e:
-        show_overlay('answer', f"❌ Network error: {str(e)}\nPlease check your internet connection and try again.")
+        show_overlay(AnswerError(f"❌ Network error: {str(e)}\nPlease check your internet connection and try again."))
     except json.JSONDecodeError as e:
-        show_overlay('answer', "❌ Error: Invalid response from OCR service. The service might be down or the response format changed.")
+        show_overlay(AnswerError("❌ Error: Invalid response from OCR service. The service might be down or the response format changed."))
     except Exception as e:
         error_msg = str(e)
         if "API key" in error_msg:
-            show_overlay('answer', f"❌ {error_msg}")
+            show_overlay(AnswerError(f"❌ {error_msg}"))
         else:
-            show_overlay('answer', f"❌ Error: {error_msg}\n\nIf this problem persists, please try the following:\n1. Ensure the text in the image is clear and well-lit\n2. Try capturing a different area\n3. Check your internet connection\n4. Restart the application")
+            show_overlay(AnswerError(f"❌ Error: {error_msg}\n\nIf this problem persists, please try the following:\n1. Ensure the text in the image is clear and well-lit\n2. Try capturing a different area\n3. Check your internet connection\n4. Restart the application"))
     finally:
-        # Clean up the screenshot file
-        try:
-            if os.path.exists(image_path):
-                os.remove(image_path)
-        except Exception as e:
-            print(f"[CLEANUP ERROR] {e}")
-        
         # Reset the UI state
         reset_ui_state()
 
 def get_ai_answer():
     global latest_transcript, chat
     if not latest_transcript:
-        show_overlay('answer', "No question detected.")
+        show_overlay(AnswerError("No question detected."))
         return
     q = latest_transcript.strip()
-    show_overlay('answer', f"Q: {q}\n\nA: ...")
+    trace = tracer.start("voice", q)
+    cached = answer_cache.lookup(chat[1].system_prompt, q) if chat else None
+    if cached:
+        trace.mark("cache_hit")
+        answer_from_cache(q, q, cached, trace)
+        latest_transcript = ""
+        return
     full_resp = ""
     token = QApplication.instance()._backend_token
-    if token and backend_get_credits(token) <= 0:
-        show_overlay('answer', "Not enough credits.")
+    # Approved against the locally known balance; the backend hold follows in the background.
+    auth = ledger.preauthorize(token) if token else None
+    if token and auth is None:
+        trace.finish("no_credits")
+        # Drop whatever an older stream still has queued, then show the error
+        set_active_request(None)
+        show_overlay(AnswerError("Not enough credits."))
         return
+    trace.mark("credit_check")
+    handle = None
+    billed = False
     try:
-        for chunk in get_response_from_chat_stream(chat, q):
+        trace.mark("llm_request")
+        speculative = speculator.take(q) if speculator else None
+        if speculative:
+            trace.mark("speculative_hit")
+            handle = speculative.handle
+            scheduler.promote(handle)
+            stream = speculative.iter_chunks()
+        else:
+            handle = scheduler.start(chat, q)
+            stream = handle
+        # Take over the overlay before clearing it, so deltas still queued by
+        # a superseded stream are dropped rather than appended to this answer
+        set_active_request(handle.request_id)
+        show_overlay(AnswerStarted(q, handle.request_id))
+        if auth:
+            auth.on_rejected(handle.cancel)
+        for chunk in stream:
+            trace.chunk(chunk)
             full_resp += chunk
-            show_overlay('answer', f"Q: {q}\n\nA: {full_resp}")
-        if token:
-            backend_deduct_and_log(token, q, full_resp)
+            show_overlay(AnswerDelta(chunk, handle.request_id))
+        if auth and auth.rejected:
+            # The backend refused the hold: stop here and bill nothing.
+            trace.finish("no_credits")
+            show_overlay(AnswerError("Not enough credits.", handle.request_id))
+            return
+        show_overlay(AnswerDone(handle.request_id))
+        if handle.cancelled:
+            # A newer question took over the overlay; bill only what was generated.
+            trace.finish("superseded")
+        elif full_resp:
+            answer_cache.put(chat[1].system_prompt, q, full_resp)
+        if auth and full_resp:
+            def _settled():
+                trace.mark("backend_log")
+                trace.finish()
+            ledger.settle(auth, q, full_resp, estimate_tokens(full_resp), done_callback=_settled)
+            billed = True
+        else:
+            trace.finish()
     except Exception as e:
-        show_overlay('answer', f"AI error: {e}")
+        trace.finish("error")
+        show_overlay(AnswerError(f"AI error: {e}", handle.request_id if handle else None))
     finally:
-        show_overlay('question', "Listening...")
-        latest_transcript = ""
+        if auth and not billed:
+            ledger.release(auth)
+        # The scheduler has already released a finished stream, so ask the
+        # overlay instead: only a newer question owning it skips the reset.
+        if handle is None or get_active_request() == handle.request_id:
+            show_overlay(QuestionSet("Listening..."))
+            latest_transcript = ""
+
+def answer_from_cache(question, display_question, answer, trace):
+    """Show a cached answer at once, keep it in the conversation and log it unbilled."""
+    # Any in-flight or speculative stream for an older question is now stale.
+    scheduler.cancel_all()
+    if speculator:
+        speculator.take(question)
+    set_active_request(None)
+    trace.chunk(answer)
+    show_overlay(AnswerStarted(display_question))
+    show_overlay(AnswerDelta(answer))
+    show_overlay(AnswerDone())
+    chat[1].add_turn(question, answer)
+    token = getattr(QApplication.instance(), '_backend_token', None)
+    if token:
+        backend_deduct_and_log_async(token, question, answer, trace, cached=True)
+    else:
+        trace.finish()
+    show_overlay(QuestionSet("Listening..."))
 
 def get_ai_answer_threaded():
     """Wrapper to run get_ai_answer in a separate thread to avoid blocking the UI"""
@@ -289,7 +384,9 @@ def handle_transcription(text, is_final):
     global latest_transcript
     # set latest_transcript (streaming or final)
     latest_transcript = text
-    show_overlay('question', latest_transcript)
+    show_overlay(QuestionSet(latest_transcript))
+    if speculator:
+        speculator.on_transcript(text, is_final)
 
 # =========================
 # Application class
@@ -323,9 +420,12 @@ class MainApplication(QApplication):
 
     def start_main_app(self, chat_instance, device_index, assembly_key, ocr_key):
         """Start the main interview assistant with overlay and transcription."""
-        global chat, transcription_thread, overlay_window, stop_event
+        global chat, transcription_thread, overlay_window, stop_event, speculator
         chat = chat_instance
         set_backend_token(self._backend_token)
+        if self._backend_token:
+            ledger.refresh_async(self._backend_token)
+        speculator = Speculator(chat) if SPECULATIVE_ENABLED else None
 
         # Create and show floating overlay
         overlay_window = FloatingOverlay(
@@ -349,13 +449,17 @@ class MainApplication(QApplication):
 
 def stop_assistant():
     """Stop the assistant and return to launcher"""
-    global stop_event, overlay_window, transcription_thread
+    global stop_event, overlay_window, transcription_thread, speculator
     
     print("Stopping assistant...")
     
     # Set stop event to signal all threads to stop
     if stop_event:
         stop_event.set()
+    if speculator:
+        speculator.stop()
+        speculator = None
+    scheduler.cancel_all()
     
     # Wait for transcription thread to finish
     if transcription_thread and transcription_thread.is_alive():
@@ -363,7 +467,12 @@ def stop_assistant():
         transcription_thread.join(timeout=3.0)  # Wait up to 3 seconds
         if transcription_thread.is_alive():
             print("Warning: Transcription thread did not stop gracefully")
+    stop_transcript_shipper()
+    answer_cache.flush()
     
+    tracer.print_summary()
+    pump_stats.print_summary()
+
     # Close overlay window
     if overlay_window:
         try:
@@ -397,6 +506,9 @@ def listen_for_escape_key():
 
 
 if __name__=="__main__":
+    # Resume extraction may use a process pool; required for the frozen Windows build.
+    multiprocessing.freeze_support()
+
     # Start escape key listener
     esc_thread = threading.Thread(target=listen_for_escape_key, daemon=True)
     esc_thread.start()
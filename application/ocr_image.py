@@ -0,0 +1,78 @@
+# ocr_image.py
+import io
+import os
+import time
+
+from PIL import Image, ImageOps, ImageStat
+
+# Longest side of the image sent to OCR. Screen text stays well above the
+# size OCR needs at this resolution, while a 4K capture shrinks ~4x in pixels.
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2000"))
+# zlib level for the PNG upload (lossless); 6 is the usual size/speed balance
+OCR_PNG_COMPRESS_LEVEL = int(os.getenv("OCR_PNG_COMPRESS_LEVEL", "6"))
+# OCR.space rejects larger uploads
+OCR_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+
+class OcrImage:
+    """An encoded, OCR-ready screenshot held in memory."""
+
+    def __init__(self, data, size, source_size, timings_ms):
+        self.data = data
+        self.size = size
+        self.source_size = source_size
+        self.timings_ms = timings_ms
+
+    def describe(self):
+        (sw, sh), (w, h) = self.source_size, self.size
+        steps = ", ".join(f"{k} {v} ms" for k, v in self.timings_ms.items())
+        return f"{sw}x{sh} -> {w}x{h} gray, {len(self.data) / 1024:.0f} KB ({steps})"
+
+
+def image_from_qimage(qimage):
+    """Copy a QImage (e.g. QPixmap.toImage()) into a Pillow image without encoding it."""
+    from PyQt5.QtGui import QImage
+
+    qimage = qimage.convertToFormat(QImage.Format_RGB32)
+    width, height = qimage.width(), qimage.height()
+    ptr = qimage.constBits()
+    ptr.setsize(qimage.byteCount())
+    # Format_RGB32 is 0xffRRGGBB, i.e. B, G, R, X bytes on little-endian machines
+    return Image.frombytes("RGB", (width, height), bytes(ptr), "raw", "BGRX", qimage.bytesPerLine(), 1)
+
+
+def prepare_for_ocr(image, max_side=OCR_MAX_SIDE):
+    """
+    Grayscale, downscale to at most ``max_side``, normalize contrast (dark
+    themes are inverted to dark-on-light) and encode as PNG in memory.
+    """
+    timings = {}
+    t0 = time.perf_counter()
+
+    def lap(name):
+        nonlocal t0
+        now = time.perf_counter()
+        timings[name] = round((now - t0) * 1000, 1)
+        t0 = now
+
+    source_size = image.size
+    gray = image.convert("L")
+    lap("gray")
+
+    scale = max_side / float(max(gray.size))
+    if scale < 1:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        # reducing_gap box-reduces first, so big downscales stay fast
+        gray = gray.resize(size, Image.LANCZOS, reducing_gap=2.0)
+    lap("scale")
+
+    if ImageStat.Stat(gray).mean[0] < 128:
+        gray = ImageOps.invert(gray)
+    gray = ImageOps.autocontrast(gray, cutoff=1)
+    lap("contrast")
+
+    buffer = io.BytesIO()
+    gray.save(buffer, format="PNG", compress_level=OCR_PNG_COMPRESS_LEVEL)
+    lap("encode")
+
+    return OcrImage(buffer.getvalue(), gray.size, source_size, timings)
@@ -0,0 +1,58 @@
+# overlay_events.py
+"""
+Events sent from the answer pipeline to the overlay (see overlay_ui2.show_overlay).
+
+Every event carries the id of the answer request it belongs to. The overlay
+drops events whose id is not the active request; ``None`` is always shown.
+Answers are streamed as AnswerStarted, any number of AnswerDelta carrying only
+the new text, then AnswerDone or AnswerError.
+"""
+
+
+class OverlayEvent:
+    def __init__(self, request_id=None):
+        self.request_id = request_id
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+class QuestionSet(OverlayEvent):
+    """Replace the question line (live transcript, extracted screen text, status)."""
+
+    def __init__(self, text, request_id=None):
+        super().__init__(request_id)
+        self.text = text
+
+
+class AnswerStarted(OverlayEvent):
+    """
+    A new answer is on its way: clear the answer, show ``placeholder`` and the
+    thinking state. ``question`` (if given) replaces the question line.
+    """
+
+    def __init__(self, question=None, request_id=None, placeholder="..."):
+        super().__init__(request_id)
+        self.question = question
+        self.placeholder = placeholder
+
+
+class AnswerDelta(OverlayEvent):
+    """Text appended to the current answer."""
+
+    def __init__(self, text, request_id=None):
+        super().__init__(request_id)
+        self.text = text
+
+
+class AnswerDone(OverlayEvent):
+    """The current answer is complete."""
+
+
+class AnswerError(OverlayEvent):
+    """The answer failed (or could not start); ``message`` replaces it."""
+
+    def __init__(self, message, request_id=None):
+        super().__init__(request_id)
+        self.message = message
@@ -1,19 +1,198 @@
 # overlay_ui2.py
 
+import os
+import re
 import sys
+import math
+import time
 import ctypes
-from queue import Queue
+from queue import Queue, Empty
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
-    QSizePolicy, QFrame, QPushButton, QScrollArea, QTextEdit
+    QSizePolicy, QFrame, QPushButton, QScrollArea, QTextEdit, QMenu, QRubberBand
 )
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect, QSize
+from PyQt5.QtGui import QFont, QTextCursor, QPainter, QColor, QCursor
+from latency_tracer import tracer, percentile
+from overlay_events import QuestionSet, AnswerStarted, AnswerDelta, AnswerDone, AnswerError
+from screen_capture import capturer
 
 # Constant to exclude the window from screen capture
 WDA_EXCLUDEFROMCAPTURE = 0x11
 user32 = ctypes.windll.user32
 message_queue = Queue()
+# Id of the answer request that currently owns the overlay. Events tagged
+# with any other id come from a superseded stream and are dropped.
+_active_request_id = None
+# Upper bound on overlay repaints per second. Each frame drains everything
+# queued since the last one and applies it in one go (see coalesce_events).
+OVERLAY_MAX_FPS = int(os.getenv("OVERLAY_MAX_FPS", "30"))
+# While text streams in, window geometry is recomputed at most this often.
+RELAYOUT_INTERVAL_MS = 80
+
+# Whitespace clean-up applied to overlay text (see clean_text)
+_SPACES_RE = re.compile(r' +')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+
+
+def clean_text(text):
+    """Collapse runs of spaces and blank lines, and strip the ends."""
+    if not text:
+        return text
+    text = _SPACES_RE.sub(' ', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text)
+    return text.strip()
+
+
+class StreamingCleaner:
+    """
+    clean_text for text that arrives in pieces: ``feed(chunk)`` returns the
+    cleaned text to append. Trailing whitespace is held back until more text
+    follows, so every whitespace run is cleaned in one piece and the
+    concatenated output equals clean_text of the whole text.
+    """
+
+    def __init__(self):
+        self.pending = ""
+        self.started = False
+
+    def feed(self, chunk):
+        text = self.pending + chunk
+        body = text.rstrip()
+        self.pending = text[len(body):]
+        if not self.started:
+            body = body.lstrip()
+            if not body:
+                return ""
+            self.started = True
+        return _BLANK_LINES_RE.sub('\n\n', _SPACES_RE.sub(' ', body))
+
+
+def coalesce_events(events):
+    """
+    Reduce one frame's events to those that change the final screen: only the
+    last QuestionSet is kept and consecutive AnswerDeltas of a request are
+    joined into one.
+    """
+    last_question = None
+    for i, event in enumerate(events):
+        if isinstance(event, QuestionSet):
+            last_question = i
+    result = []
+    parts = []
+    for i, event in enumerate(events):
+        if isinstance(event, QuestionSet) and i != last_question:
+            continue
+        if isinstance(event, AnswerDelta):
+            if parts and parts[0].request_id == event.request_id:
+                parts.append(event)
+                continue
+            _flush_deltas(parts, result)
+            parts = [event]
+            continue
+        _flush_deltas(parts, result)
+        parts = []
+        result.append(event)
+    _flush_deltas(parts, result)
+    return result
+
+
+def _flush_deltas(parts, result):
+    if len(parts) == 1:
+        result.append(parts[0])
+    elif parts:
+        result.append(AnswerDelta("".join(p.text for p in parts), parts[0].request_id))
+
+
+class OverlayPumpStats:
+    """Queue depth and queue-to-screen lag of the overlay message pump."""
+
+    def __init__(self, max_samples=2000):
+        self.max_samples = max_samples
+        self.frames = 0
+        self.messages = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.lag_ms = []
+
+    def record_frame(self, depth, rendered, oldest_enqueued_at):
+        self.frames += 1
+        self.messages += depth
+        self.coalesced += depth - rendered
+        self.max_depth = max(self.max_depth, depth)
+        # How long the oldest message of this frame waited before it reached the screen
+        self.lag_ms.append(round((time.monotonic() - oldest_enqueued_at) * 1000, 1))
+        if len(self.lag_ms) > self.max_samples:
+            del self.lag_ms[:len(self.lag_ms) - self.max_samples]
+
+    def summary(self):
+        return {
+            "frames": self.frames,
+            "messages": self.messages,
+            "coalesced": self.coalesced,
+            "max_depth": self.max_depth,
+            "lag_ms": (percentile(self.lag_ms, 50), percentile(self.lag_ms, 95)),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        if not stats["frames"]:
+            return
+        p50, p95 = stats["lag_ms"]
+        print(f"[OVERLAY PUMP] {stats['messages']} message(s) in {stats['frames']} frame(s), "
+              f"{stats['coalesced']} coalesced, max depth {stats['max_depth']}, "
+              f"lag p50 {p50} ms / p95 {p95} ms")
+
+
+pump_stats = OverlayPumpStats()
+
+
+class RegionSelector(QWidget):
+    """
+    Dimmed full-screen layer over one screen; the rectangle dragged on it is
+    passed to ``on_selected(screen, (x, y, width, height))`` as fractions of
+    the screen. Esc cancels.
+    """
+
+    def __init__(self, screen, on_selected):
+        super().__init__()
+        self.target_screen = screen
+        self.on_selected = on_selected
+        self.origin = None
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setCursor(Qt.CrossCursor)
+        self.setGeometry(screen.geometry())
+        self.rubber_band = QRubberBand(QRubberBand.Rectangle, self)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 90))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.origin = event.pos()
+            self.rubber_band.setGeometry(QRect(self.origin, QSize()))
+            self.rubber_band.show()
+
+    def mouseMoveEvent(self, event):
+        if self.origin is not None:
+            self.rubber_band.setGeometry(QRect(self.origin, event.pos()).normalized())
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton or self.origin is None:
+            return
+        rect = QRect(self.origin, event.pos()).normalized()
+        self.close()
+        if rect.width() >= 10 and rect.height() >= 10:
+            w, h = float(self.width()), float(self.height())
+            self.on_selected(self.target_screen,
+                             (rect.x() / w, rect.y() / h, rect.width() / w, rect.height() / h))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.close()
 
 class FloatingOverlay(QWidget):
     def __init__(self, process_callback=None, stop_callback=None, capture_callback=None):
@@ -21,13 +200,23 @@ class FloatingOverlay(QWidget):
         self.process_callback = process_callback
         self.stop_callback = stop_callback
         self.capture_callback = capture_callback
+        # True once Windows leaves the overlay out of screenshots (see showEvent)
+        self.capture_excluded = False
+        self._region_selector = None
         self._setup_window()
         self.init_ui()
         self._setup_animations()
 
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.check_queue)
-        self.timer.start(100)
+        self.timer.start(max(1, 1000 // OVERLAY_MAX_FPS))
+
+        # Throttles resize_to_content while an answer streams
+        self._relayout_timer = QTimer(self)
+        self._relayout_timer.setSingleShot(True)
+        self._relayout_timer.setInterval(RELAYOUT_INTERVAL_MS)
+        self._relayout_timer.timeout.connect(self.resize_to_content)
+        self._content_heights = None
 
     def _setup_window(self):
         screen_geometry = QApplication.primaryScreen().geometry()
@@ -173,45 +362,56 @@ class FloatingOverlay(QWidget):
         answer_inner_layout.setContentsMargins(0, 0, 0, 0)
         answer_inner_layout.setSpacing(0)
         
-        # Create a container widget for the label to ensure proper sizing
-        self.answer_label_container = QWidget()
-        self.answer_label_container.setStyleSheet("""
+        # Create a container widget for the answer view to ensure proper sizing
+        self.answer_view_container = QWidget()
+        self.answer_view_container.setStyleSheet("""
             background: transparent;
             border: none;
         """)
-        # Make label container expand to fill available space
-        self.answer_label_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        
-        # Layout for the label container
-        self.answer_label_layout = QVBoxLayout(self.answer_label_container)
-        self.answer_label_layout.setContentsMargins(10, 10, 10, 10)  
-        self.answer_label_layout.setSpacing(0)
-
-        # The actual label that will contain the answer text
-        self.answer_label = QLabel("")
-        self.answer_label.setWordWrap(True)
-        self.answer_label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-        self.answer_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        self.answer_label.setStyleSheet("""
-            background-color: transparent; 
-            color: #F7FAFC; 
-            font-family: 'Segoe UI';
-            font-size: 13pt; 
-            font-weight: 600; 
-            line-height: 1.5;
-            padding: 0;
-            margin: 0;
-            width: 100%;
+        # Make view container expand to fill available space
+        self.answer_view_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        
+        # Layout for the view container
+        self.answer_view_layout = QVBoxLayout(self.answer_view_container)
+        self.answer_view_layout.setContentsMargins(10, 10, 10, 10)  
+        self.answer_view_layout.setSpacing(0)
+
+        # Read-only document the answer is appended to as it streams. It never
+        # scrolls itself: its height follows the document and the answer
+        # scroll area below does the scrolling.
+        self.answer_view = QTextEdit()
+        self.answer_view.setReadOnly(True)
+        self.answer_view.setFrameShape(QFrame.NoFrame)
+        self.answer_view.setLineWrapMode(QTextEdit.WidgetWidth)
+        self.answer_view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.answer_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        # Let clicks reach the window so the overlay can still be dragged
+        self.answer_view.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.answer_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.answer_view.setStyleSheet("""
+            QTextEdit {
+                background-color: transparent; 
+                color: #F7FAFC; 
+                font-family: 'Segoe UI';
+                font-size: 13pt; 
+                font-weight: 600; 
+                border: none;
+                padding: 0;
+                margin: 0;
+            }
         """)
-        self.answer_label_layout.addWidget(self.answer_label)
-        self.answer_label_layout.addStretch()
-
-        # Add the label to its container
-        self.answer_label_layout.addWidget(self.answer_label)
-        self.answer_label_layout.addStretch()
-        
-        # Add the label container to the answer container with stretch
-        answer_inner_layout.addWidget(self.answer_label_container, 1)
+        self.answer_view.document().setDocumentMargin(0)
+        self.answer_view.document().documentLayout().documentSizeChanged.connect(self._on_answer_size_changed)
+        self._answer_cursor = QTextCursor(self.answer_view.document())
+        self._answer_cleaner = StreamingCleaner()
+        self._answer_streaming = False
+        self._answer_doc_height = 0
+        self.answer_view.setFixedHeight(1)
+        self.answer_view_layout.addWidget(self.answer_view)
+        self.answer_view_layout.addStretch()
+        
+        # Add the view container to the answer container with stretch
+        answer_inner_layout.addWidget(self.answer_view_container, 1)
         
         # Create the scroll area for the answer
         self.answer_scroll = QScrollArea()
@@ -237,11 +437,6 @@ class FloatingOverlay(QWidget):
         # Connect signals
         self.answer_scroll.verticalScrollBar().rangeChanged.connect(ensure_scroll_to_end)
         
-        # Install event filter to handle viewport resize
-        self.answer_scroll.viewport().installEventFilter(self)
-            
-        # Connect the scrollbar's range changed signal to ensure we scroll to bottom
-        
         self.answer_scroll.setStyleSheet("""
             QScrollArea {
                 background: transparent;
@@ -332,6 +527,9 @@ class FloatingOverlay(QWidget):
             }
         """)
         self.capture_button.clicked.connect(self.on_capture_click)
+        self.capture_button.setToolTip("Right-click to choose the monitor or a region")
+        self.capture_button.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.capture_button.customContextMenuRequested.connect(self.show_capture_menu)
 
         self.stop_button = QPushButton("⏹️ Stop")
         self.stop_button.setCursor(Qt.PointingHandCursor)
@@ -389,14 +587,14 @@ class FloatingOverlay(QWidget):
     def on_capture_click(self):
         if self.capture_callback:
             self.status_icon_label.setText("📸")
-            self.answer_label.setText("Capturing screen...")
+            self.set_answer("Capturing screen...")
             self.capture_button.setEnabled(False)
             self.capture_button.setText("⏳ Capturing...")
             QApplication.processEvents()  # Update UI immediately
             try:
                 self.capture_callback()
             except Exception as e:
-                self.answer_label.setText(f"❌ Capture failed: {str(e)}")
+                self.set_answer(f"❌ Capture failed: {str(e)}")
                 self.status_icon_label.setText("❌")
             finally:
                 self.capture_button.setEnabled(True)
@@ -405,7 +603,7 @@ class FloatingOverlay(QWidget):
     def on_process_click(self):
         if self.process_callback:
             self.status_icon_label.setText("🤔")
-            self.answer_label.setText("...")
+            self.set_answer("...")
             # Disable button and change text to indicate processing
             self.process_button.setEnabled(False)
             self.process_button.setText("🤔 Thinking...")
@@ -415,6 +613,37 @@ class FloatingOverlay(QWidget):
             # Call the callback (should be threaded to avoid blocking)
             self.process_callback()
 
+    def show_capture_menu(self, pos):
+        menu = QMenu(self)
+        select_action = menu.addAction("Select region...")
+        full_action = menu.addAction("Capture whole monitor")
+        full_action.setEnabled(capturer.region is not None)
+        menu.addSeparator()
+        monitor_actions = {}
+        for index, monitor in enumerate(capturer.monitors()):
+            action = menu.addAction(f"Monitor {index + 1} ({monitor['width']}x{monitor['height']})")
+            action.setCheckable(True)
+            action.setChecked(index == capturer.monitor)
+            monitor_actions[action] = index
+        chosen = menu.exec_(self.capture_button.mapToGlobal(pos))
+        if chosen is select_action:
+            self.select_capture_region()
+        elif chosen is full_action:
+            capturer.clear_region()
+        elif chosen in monitor_actions:
+            capturer.set_monitor(monitor_actions[chosen])
+
+    def select_capture_region(self):
+        screen = QApplication.screenAt(QCursor.pos()) or QApplication.primaryScreen()
+        self._region_selector = RegionSelector(screen, self._on_region_selected)
+        self._region_selector.show()
+        self._region_selector.activateWindow()
+
+    def _on_region_selected(self, screen, region):
+        capturer.set_region(capturer.backend.index_for_screen(screen), region)
+        print(f"[CAPTURE] region set on monitor {capturer.monitor + 1}: "
+              + ", ".join(f"{v:.3f}" for v in region))
+
     def on_stop_click(self):
         if self.stop_callback:
             self.stop_callback()
@@ -442,22 +671,17 @@ class FloatingOverlay(QWidget):
         self.fade_animation = QPropertyAnimation(self, b"windowOpacity")
         self.fade_animation.setDuration(300)
         self.fade_animation.setEasingCurve(QEasingCurve.InOutQuad)
+        # Reused for every height change instead of a new animation per update
         self.resize_animation = QPropertyAnimation(self, b"geometry")
-        self.resize_animation.setDuration(250)
-        self.resize_animation.setEasingCurve(QEasingCurve.InOutCubic)
-    def eventFilter(self, obj, event):
-        """Handle viewport resize events to update label width"""
-        if obj == self.answer_scroll.viewport():
-            if event.type() == event.Resize:
-                if self.answer_label:
-                    self.answer_label.setFixedWidth(self.answer_scroll.viewport().width())
-        return super().eventFilter(obj, event)
+        self.resize_animation.setDuration(200)
+        self.resize_animation.setEasingCurve(QEasingCurve.OutCubic)
 
     def showEvent(self, event):
         super().showEvent(event)
         try:
             hwnd = self.winId().__int__()
-            user32.SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE)
+            # Non-zero only where Windows supports excluding the window (10 2004+)
+            self.capture_excluded = bool(user32.SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE))
         except AttributeError:
             pass # Fails gracefully on non-Windows OS
         self.fade_animation.setStartValue(0.0)
@@ -465,78 +689,123 @@ class FloatingOverlay(QWidget):
         self.fade_animation.start()
 
     def check_queue(self):
-        if not message_queue.empty():
-            message_type, text = message_queue.get()
-            if message_type == 'question':
-                # Clean up text by removing excessive whitespace and gaps
-                cleaned_text = self.clean_text(text)
-                self.question_label.setText(cleaned_text)
-                if cleaned_text.startswith("Q:"):
-                    self.status_icon_label.setText("❓")
-                else:
-                    self.status_icon_label.setText("🎙️")
-            elif message_type == 'answer':
-                # Clean up answer text and handle Q: A: format
-                cleaned_text = self.clean_text(text)
-                answer_text = cleaned_text
-                if cleaned_text.startswith("Q:") and "\n\nA:" in cleaned_text:
-                    # Split Q: and A: parts
-                    parts = cleaned_text.split("\n\nA:", 1)
-                    if len(parts) == 2:
-                        question_part = parts[0].replace("Q:", "").strip()
-                        answer_part = parts[1].strip()
-                        self.question_label.setText(question_part)
-                        self.answer_label.setText(answer_part)
-                        answer_text = answer_part
-                    else:
-                        self.answer_label.setText(cleaned_text)
-                else:
-                    self.answer_label.setText(cleaned_text)
-                self.answer_label.setFixedWidth(self.answer_scroll.viewport().width())
-                # Check if we're still processing (answer is "...") or if we have a real answer
-                if answer_text.strip() == "...":
-                    # Still processing - keep button disabled
-                    self.status_icon_label.setText("🤔")
-                    self.process_button.setEnabled(False)
-                    self.process_button.setText("🤔 Thinking...")
-                    self.process_button.setCursor(Qt.ForbiddenCursor)
-                else:
-                    # Answer received - re-enable button and restore original text
-                    self.status_icon_label.setText("💡")
-                    self.process_button.setEnabled(True)
-                    self.process_button.setText(self.process_button_default_text)
-                    self.process_button.setCursor(Qt.PointingHandCursor)
-
-            self.resize_to_content()
-
-    def clean_text(self, text):
-        """Clean text by removing excessive whitespace and formatting issues"""
-        if not text:
-            return text
-            
-        # Remove excessive newlines and spaces
-        import re
-        # Replace multiple spaces with single space
-        text = re.sub(r' +', ' ', text)
-        # Replace multiple newlines with double newline
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        # Remove leading/trailing whitespace
-        text = text.strip()
-        
-        return text
+        """Render one frame: drain the queue and apply its events in one go."""
+        events = []
+        depth = 0
+        oldest = None
+        while True:
+            try:
+                event, enqueued_at = message_queue.get_nowait()
+            except Empty:
+                break
+            depth += 1
+            if oldest is None:
+                oldest = enqueued_at
+            if event.request_id is not None and event.request_id != _active_request_id:
+                continue
+            events.append(event)
+        if not depth:
+            return
+        events = coalesce_events(events)
+        for event in events:
+            self.apply_event(event)
+        if events:
+            self.schedule_relayout()
+        pump_stats.record_frame(depth, len(events), oldest)
+
+    def apply_event(self, event):
+        if isinstance(event, QuestionSet):
+            # Clean up text by removing excessive whitespace and gaps
+            cleaned_text = clean_text(event.text)
+            self.question_label.setText(cleaned_text)
+            if cleaned_text.startswith("Q:"):
+                self.status_icon_label.setText("❓")
+            else:
+                self.status_icon_label.setText("🎙️")
+        elif isinstance(event, AnswerStarted):
+            if event.question is not None:
+                self.question_label.setText(clean_text(event.question))
+            self.set_answer(event.placeholder)
+            self._answer_streaming = False
+            self.set_thinking(True)
+        elif isinstance(event, AnswerDelta):
+            if self._answer_streaming:
+                self.append_answer(event.text)
+            else:
+                # First text of the answer replaces the placeholder
+                self.set_answer(event.text)
+                self._answer_streaming = True
+                self.set_thinking(False)
+            tracer.mark_render()
+        elif isinstance(event, AnswerDone):
+            if not self._answer_streaming:
+                self.set_answer("")
+            self._answer_streaming = False
+            self.set_thinking(False)
+        elif isinstance(event, AnswerError):
+            self.set_answer(event.message)
+            self._answer_streaming = False
+            self.set_thinking(False)
+            self.status_icon_label.setText("❌")
+
+    def set_thinking(self, thinking):
+        if thinking:
+            # Still processing - keep button disabled
+            self.status_icon_label.setText("🤔")
+            self.process_button.setEnabled(False)
+            self.process_button.setText("🤔 Thinking...")
+            self.process_button.setCursor(Qt.ForbiddenCursor)
+        else:
+            # Answer received - re-enable button and restore original text
+            self.status_icon_label.setText("💡")
+            self.process_button.setEnabled(True)
+            self.process_button.setText(self.process_button_default_text)
+            self.process_button.setCursor(Qt.PointingHandCursor)
+
+    # --- answer document ------------------------------------------------
+
+    def set_answer(self, text):
+        """Replace the answer with ``text``."""
+        self._answer_cleaner = StreamingCleaner()
+        self.answer_view.setPlainText(self._answer_cleaner.feed(text))
+        self._answer_cursor = QTextCursor(self.answer_view.document())
+        self._answer_cursor.movePosition(QTextCursor.End)
+
+    def append_answer(self, delta):
+        """Append ``delta`` to the answer without touching the text already shown."""
+        cleaned = self._answer_cleaner.feed(delta)
+        if cleaned:
+            self._answer_cursor.movePosition(QTextCursor.End)
+            self._answer_cursor.insertText(cleaned)
+
+    def _on_answer_size_changed(self, size):
+        height = math.ceil(size.height())
+        if height == self._answer_doc_height:
+            return
+        # Only a new line (or a new answer) changes the geometry
+        self._answer_doc_height = height
+        self.answer_view.setFixedHeight(max(1, height))
+        self.schedule_relayout()
+
+    def schedule_relayout(self):
+        if not self._relayout_timer.isActive():
+            self._relayout_timer.start()
 
     def resize_to_content(self):
-        # Update both question and answer labels' size hints
+        # Update the question label's size hint; the answer height is tracked
+        # from its document (see _on_answer_size_changed)
         self.question_label.adjustSize()
-        self.answer_label.adjustSize()
         
         # Calculate required heights
         question_height = self.question_label.sizeHint().height() + 40  # Add some padding
-        answer_height = self.answer_label.sizeHint().height() + 40  # Add some padding
+        answer_height = self._answer_doc_height + 40  # Add some padding
         
         # Clamp heights between min and max values
         question_height = max(60, min(question_height, 200))  # Question area: 60-200px
         answer_height = max(60, min(answer_height, 300))      # Answer area: 60-300px
+        if (question_height, answer_height) == self._content_heights:
+            return
+        self._content_heights = (question_height, answer_height)
         
         # Set the scroll area heights
         self.question_scroll.setFixedHeight(question_height)
@@ -549,15 +818,19 @@ class FloatingOverlay(QWidget):
         # Calculate total height needed
         suggested_height = self.sizeHint().height()
         target_height = max(self.initial_height, min(suggested_height, self.max_height))
-        
-        # Apply the new size with animation
-        if self.height() != target_height:
-            self.animation = QPropertyAnimation(self, b"geometry")
-            self.animation.setDuration(200)
-            self.animation.setStartValue(self.geometry())
-            self.animation.setEndValue(QRect(self.x(), self.y(), self.width(), target_height))
-            self.animation.setEasingCurve(QEasingCurve.OutCubic)
-            self.animation.start()
+        self._animate_height(target_height)
+
+    def _animate_height(self, target_height):
+        end = QRect(self.x(), self.y(), self.width(), target_height)
+        if self.resize_animation.state() == QPropertyAnimation.Running:
+            if self.resize_animation.endValue() == end:
+                return
+            self.resize_animation.stop()
+        elif self.height() == target_height:
+            return
+        self.resize_animation.setStartValue(self.geometry())
+        self.resize_animation.setEndValue(end)
+        self.resize_animation.start()
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -578,8 +851,18 @@ class FloatingOverlay(QWidget):
         event.accept()
 
 
-def show_overlay(message_type, text):
-    message_queue.put((message_type, text))
+def set_active_request(request_id):
+    global _active_request_id
+    _active_request_id = request_id
+
+
+def get_active_request():
+    return _active_request_id
+
+
+def show_overlay(event):
+    """Queue an overlay event (see overlay_events); safe to call from any thread."""
+    message_queue.put((event, time.monotonic()))
 
 
 if __name__ == '__main__':
@@ -606,9 +889,14 @@ if __name__ == '__main__':
         ]
         
         # Update the UI with random sample data
-        show_overlay('question', random.choice(questions))
-        # Show an answer after a short delay
-        QTimer.singleShot(1500, lambda: show_overlay('answer', random.choice(answers)))
+        show_overlay(QuestionSet(random.choice(questions)))
+        show_overlay(AnswerStarted())
+
+        # Stream an answer word by word after a short delay
+        words = random.choice(answers).split(" ")
+        for i, word in enumerate(words):
+            QTimer.singleShot(1500 + 40 * i, lambda w=word, first=(i == 0): show_overlay(AnswerDelta(w if first else " " + w)))
+        QTimer.singleShot(1500 + 40 * len(words), lambda: show_overlay(AnswerDone()))
 
     # Use a QTimer to call the test function every 5 seconds
     update_timer = QTimer()
@@ -0,0 +1,52 @@
+# pdf_extract.py
+# Kept free of heavy imports: process-pool workers import this module on spawn.
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+# Documents with at least this many pages are split across worker processes.
+PARALLEL_PAGE_THRESHOLD = 12
+PAGE_BATCH_SIZE = 6
+
+
+def _extract_page_range(file_path, start, stop):
+    """Worker: parse pages [start, stop) once each and time them."""
+    reader = PyPDF2.PdfReader(file_path)
+    results = []
+    for index in range(start, stop):
+        t0 = time.perf_counter()
+        text = reader.pages[index].extract_text() or ""
+        results.append((index, text, time.perf_counter() - t0))
+    return results
+
+
+def iter_pdf_pages(file_path, parallel_threshold=PARALLEL_PAGE_THRESHOLD, batch_size=PAGE_BATCH_SIZE):
+    """
+    Yield ``(page_index, text, seconds)`` in page order, extracting each page once.
+
+    Small documents are parsed in-process. Large ones are split into page
+    batches on a process pool; batches are still yielded in order, and closing
+    the generator early cancels batches that have not started yet.
+    """
+    reader = PyPDF2.PdfReader(file_path)
+    page_count = len(reader.pages)
+
+    if page_count < parallel_threshold:
+        for index, page in enumerate(reader.pages):
+            t0 = time.perf_counter()
+            text = page.extract_text() or ""
+            yield index, text, time.perf_counter() - t0
+        return
+
+    batches = [(start, min(start + batch_size, page_count)) for start in range(0, page_count, batch_size)]
+    workers = max(1, min(os.cpu_count() or 2, len(batches)))
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(_extract_page_range, file_path, start, stop) for start, stop in batches]
+        for future in futures:
+            for item in future.result():
+                yield item
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
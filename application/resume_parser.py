@@ -1,38 +1,182 @@
 # resume_parser.py (LangChain version)
-import PyPDF2
 import os
+import json
+import time
+import hashlib
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import HumanMessage
 
-def get_resume_summary(file_path: str) -> str:
+from ai_engine import count_tokens, CHARS_PER_TOKEN
+from pdf_extract import iter_pdf_pages
+
+# Summaries are cached per (PDF content, prompt). Bump RESUME_PROMPT_VERSION
+# whenever the prompt changes in a way the template text does not capture.
+RESUME_PROMPT_VERSION = "1"
+RESUME_PROMPT_TEMPLATE = (
+    "You are a professional resume summarizer. "
+    "Summarize the key skills, experience, and projects clearly and concisely. "
+    "Use about 5-7 sentences.\n\n"
+    "RESUME TEXT:\n{text}"
+)
+RESUME_CACHE_DIR = ".resume_cache"
+# Upper bound on resume text sent to Gemini; long CVs/portfolios are cut here.
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "6000"))
+
+_llm = None
+
+
+class ResumeProcessingCancelled(Exception):
+    """Raised when the caller cancels resume processing part-way."""
+
+
+def _get_llm():
+    global _llm
+    if _llm is None:
+        _llm = ChatGoogleGenerativeAI(
+            model="gemini-2.0-flash",
+            temperature=0.5, api_key=os.getenv("gemini_llm1")
+        )
+    return _llm
+
+
+def prompt_key() -> str:
+    """Identifies the summary prompt; summaries made with another prompt are stale."""
+    digest = hashlib.sha256(RESUME_PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:12]
+    return f"v{RESUME_PROMPT_VERSION}-{digest}"
+
+
+def _cache_path(content_hash: str) -> str:
+    return os.path.join(RESUME_CACHE_DIR, f"{content_hash}.json")
+
+
+def load_cached_resume(content_hash: str) -> dict:
+    try:
+        with open(_cache_path(content_hash), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cached_resume(content_hash: str, text: str, summary: str = None):
+    """Store the extracted text, keeping only the summary for the current prompt."""
+    entry = {"text": text, "summaries": {}}
+    if summary:
+        entry["summaries"][prompt_key()] = summary
+    try:
+        os.makedirs(RESUME_CACHE_DIR, exist_ok=True)
+        tmp_path = _cache_path(content_hash) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, _cache_path(content_hash))
+    except OSError as e:
+        print("[RESUME CACHE] could not save cache:", e)
+
+
+def clear_resume_cache():
+    """Drop every cached resume (text and summaries)."""
+    if not os.path.isdir(RESUME_CACHE_DIR):
+        return
+    for name in os.listdir(RESUME_CACHE_DIR):
+        try:
+            os.remove(os.path.join(RESUME_CACHE_DIR, name))
+        except OSError:
+            pass
+
+
+def _check_cancel(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ResumeProcessingCancelled()
+
+
+def extract_resume_text(file_path: str, token_budget: int = RESUME_TOKEN_BUDGET,
+                        progress=None, cancel_event=None):
     """
-    Reads a PDF and generates a summary using LangChain's Gemini model.
-    This shares the same retry logic and avoids 429 errors.
+    Stream the PDF page by page and stop once ``token_budget`` is reached.
+    Returns ``(text, page_timings)`` where timings are ``(page_index, seconds)``.
     """
+    parts, timings = [], []
+    used = 0
+    t0 = time.perf_counter()
+    pages = iter_pdf_pages(file_path)
     try:
-        # Initialize the model (safe to call repeatedly)
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            temperature=0.5,api_key=os.getenv("gemini_llm1")
-        )
+        for index, page_text, seconds in pages:
+            _check_cancel(cancel_event)
+            timings.append((index, seconds))
+            if progress:
+                progress("extract", f"page {index + 1}")
+            page_text = page_text.strip()
+            if not page_text:
+                continue
+            page_tokens = count_tokens(page_text)
+            if used + page_tokens > token_budget:
+                remaining = (token_budget - used) * CHARS_PER_TOKEN
+                if remaining > 0:
+                    parts.append(page_text[:remaining])
+                print(f">> resume text capped at ~{token_budget} tokens (page {index + 1})")
+                break
+            parts.append(page_text)
+            used += page_tokens
+    finally:
+        pages.close()
+
+    if timings:
+        slowest = max(timings, key=lambda t: t[1])
+        print(f">> extracted {len(timings)} page(s) in {time.perf_counter() - t0:.2f}s "
+              f"(slowest: page {slowest[0] + 1}, {slowest[1] * 1000:.0f} ms)")
+    return " ".join(parts), timings
 
+
+def get_resume_summary(file_path: str, progress=None, on_partial=None, cancel_event=None) -> str:
+    """
+    Reads a PDF and generates a summary using LangChain's Gemini model.
+    Text and summary are cached by the SHA-256 of the file, so re-loading the
+    same resume is instant and makes no Gemini call.
+
+    ``progress(stage, detail)`` is called for the read/extract/summarize stages,
+    ``on_partial(text)`` receives the summary as it streams in, and setting
+    ``cancel_event`` aborts with ResumeProcessingCancelled.
+    """
+    try:
+        if progress:
+            progress("read", "")
         with open(file_path, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            text = " ".join(page.extract_text() for page in reader.pages if page.extract_text())
+            data = f.read()
+        content_hash = hashlib.sha256(data).hexdigest()
+        cached = load_cached_resume(content_hash)
+
+        summary = cached.get("summaries", {}).get(prompt_key())
+        if summary:
+            print(">> resume summary served from cache")
+            return summary
+
+        text = cached.get("text")
+        if text is None:
+            text, _ = extract_resume_text(file_path, progress=progress, cancel_event=cancel_event)
 
         if not text.strip():
             return "Could not summarize resume. The PDF appears to be empty or image-only."
 
-        prompt = (
-            "You are a professional resume summarizer. "
-            "Summarize the key skills, experience, and projects clearly and concisely. "
-            "Use about 5-7 sentences.\n\n"
-            f"RESUME TEXT:\n{text}"
-        )
+        prompt = RESUME_PROMPT_TEMPLATE.format(text=text)
 
-        response = llm.invoke([HumanMessage(content=prompt)])
-        print(">> resume parser response:", response.content)
-        return response.content
+        if progress:
+            progress("summarize", "")
+        parts = []
+        stream = _get_llm().stream([HumanMessage(content=prompt)])
+        try:
+            for chunk in stream:
+                _check_cancel(cancel_event)
+                if chunk.content:
+                    parts.append(chunk.content)
+                    if on_partial:
+                        on_partial("".join(parts))
+        finally:
+            stream.close()
+        summary = "".join(parts)
+        print(">> resume parser response:", summary)
+        save_cached_resume(content_hash, text, summary)
+        return summary
+    except ResumeProcessingCancelled:
+        raise
     except Exception as e:
         if "API key" in str(e):
             return "Could not summarize resume: Invalid or expired API key."
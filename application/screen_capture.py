@@ -0,0 +1,242 @@
+# screen_capture.py
+import os
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+
+from ocr_image import image_from_qimage
+
+# "mss" (default) or "qt"; mss falls back to qt when it cannot be loaded
+CAPTURE_BACKEND = os.getenv("CAPTURE_BACKEND", "mss")
+# How long to wait after hiding the overlay before capturing, when the overlay
+# cannot be excluded from screen capture (pre-2004 Windows, other platforms)
+CAPTURE_HIDE_DELAY_MS = int(os.getenv("CAPTURE_HIDE_DELAY_MS", "250"))
+# Remembered monitor and region
+CAPTURE_SETTINGS_FILE = "capture_settings.json"
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def region_rect(monitor, region):
+    """
+    Pixel rectangle of ``region`` (x, y, width, height as fractions of the
+    monitor) on ``monitor`` (left/top/width/height dict); the whole monitor
+    when ``region`` is None.
+    """
+    if not region:
+        return dict(monitor)
+    x, y, w, h = region
+    left = monitor["left"] + int(round(x * monitor["width"]))
+    top = monitor["top"] + int(round(y * monitor["height"]))
+    width = max(1, min(int(round(w * monitor["width"])), monitor["left"] + monitor["width"] - left))
+    height = max(1, min(int(round(h * monitor["height"])), monitor["top"] + monitor["height"] - top))
+    return {"left": left, "top": top, "width": width, "height": height}
+
+
+class Capture:
+    """A captured screen image and how it was taken."""
+
+    def __init__(self, image, backend, monitor, region, timings_ms):
+        self.image = image
+        self.backend = backend
+        self.monitor = monitor
+        self.region = region
+        self.timings_ms = timings_ms
+
+    def describe(self):
+        area = "region" if self.region else "full screen"
+        steps = ", ".join(f"{k} {v} ms" for k, v in self.timings_ms.items())
+        return (f"{self.backend} monitor {self.monitor + 1} {area} "
+                f"{self.image.width}x{self.image.height} ({steps})")
+
+
+class CaptureBackend(ABC):
+    """
+    Grabs screen pixels into a Pillow RGB image. Monitors are indexed in the
+    backend's own order; ``region`` is a fractional (x, y, width, height).
+    """
+
+    name = None
+
+    @abstractmethod
+    def monitors(self):
+        """Monitor rectangles as dicts with left/top/width/height."""
+
+    @abstractmethod
+    def grab(self, index, region, timings):
+        """Capture ``region`` of monitor ``index``; adds step timings to ``timings``."""
+
+    @abstractmethod
+    def index_for_screen(self, screen):
+        """Monitor index of a QScreen (used by the region selector)."""
+
+
+class MssBackend(CaptureBackend):
+    """
+    mss (GDI BitBlt on Windows): grabs only the requested rectangle and can
+    run on any thread.
+    """
+
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self._mss = mss
+        # mss handles hold per-thread GDI resources
+        self._local = threading.local()
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._local.sct = self._mss.mss()
+        return sct
+
+    def monitors(self):
+        # monitors[0] is the union of all monitors
+        return [dict(m) for m in self._sct().monitors[1:]]
+
+    def grab(self, index, region, timings):
+        from PIL import Image
+
+        rect = region_rect(self.monitors()[index], region)
+        start = time.perf_counter()
+        shot = self._sct().grab(rect)
+        timings["grab"] = _ms(start)
+        start = time.perf_counter()
+        image = Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+        timings["convert"] = _ms(start)
+        return image
+
+    def index_for_screen(self, screen):
+        # mss reports physical pixels, Qt device-independent ones: match
+        # monitors by physical size, then by position among same-sized ones.
+        from PyQt5.QtWidgets import QApplication
+
+        def physical_size(s):
+            g, dpr = s.geometry(), s.devicePixelRatio()
+            return round(g.width() * dpr), round(g.height() * dpr)
+
+        size = physical_size(screen)
+        monitors = self.monitors()
+        candidates = sorted((i for i, m in enumerate(monitors) if (m["width"], m["height"]) == size),
+                            key=lambda i: (monitors[i]["left"], monitors[i]["top"]))
+        if not candidates:
+            return 0
+        peers = sorted((s for s in QApplication.screens() if physical_size(s) == size),
+                       key=lambda s: (s.geometry().x(), s.geometry().y()))
+        position = peers.index(screen) if screen in peers else 0
+        return candidates[min(position, len(candidates) - 1)]
+
+
+class QtBackend(CaptureBackend):
+    """QScreen.grabWindow of a whole screen, cropped afterwards. UI thread only."""
+
+    name = "qt"
+
+    def _screens(self):
+        from PyQt5.QtWidgets import QApplication
+        return QApplication.screens()
+
+    def monitors(self):
+        result = []
+        for screen in self._screens():
+            g = screen.geometry()
+            result.append({"left": g.x(), "top": g.y(), "width": g.width(), "height": g.height()})
+        return result
+
+    def grab(self, index, region, timings):
+        start = time.perf_counter()
+        pixmap = self._screens()[index].grabWindow(0)
+        timings["grab"] = _ms(start)
+        start = time.perf_counter()
+        image = image_from_qimage(pixmap.toImage())
+        if region:
+            # Crop in image pixels; the pixmap may be larger than the logical geometry
+            rect = region_rect({"left": 0, "top": 0, "width": image.width, "height": image.height}, region)
+            image = image.crop((rect["left"], rect["top"],
+                                rect["left"] + rect["width"], rect["top"] + rect["height"]))
+        timings["convert"] = _ms(start)
+        return image
+
+    def index_for_screen(self, screen):
+        screens = self._screens()
+        return screens.index(screen) if screen in screens else 0
+
+
+class ScreenCapturer:
+    """
+    Captures the selected monitor, or the region the user picked on it, with
+    the configured backend. The choice is remembered in CAPTURE_SETTINGS_FILE.
+    """
+
+    def __init__(self, backend=CAPTURE_BACKEND, settings_path=CAPTURE_SETTINGS_FILE):
+        self.backend_name = backend
+        self.settings_path = settings_path
+        self.monitor = 0
+        self.region = None
+        self._backend = None
+        self._load()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if self.backend_name == "mss":
+                try:
+                    self._backend = MssBackend()
+                except Exception as e:
+                    print("[CAPTURE] mss unavailable, using Qt capture:", e)
+            if self._backend is None:
+                self._backend = QtBackend()
+        return self._backend
+
+    def monitors(self):
+        return self.backend.monitors()
+
+    def capture(self, timings=None):
+        """Capture the current target; ``timings`` holds steps measured by the caller."""
+        timings = dict(timings or {})
+        backend = self.backend
+        count = len(backend.monitors())
+        index = self.monitor if self.monitor < count else 0
+        region = self.region if index == self.monitor else None
+        image = backend.grab(index, region, timings)
+        return Capture(image, backend.name, index, region, timings)
+
+    def set_monitor(self, index):
+        self.monitor = index
+        self.region = None
+        self._save()
+
+    def set_region(self, index, region):
+        self.monitor = index
+        self.region = tuple(region)
+        self._save()
+
+    def clear_region(self):
+        self.region = None
+        self._save()
+
+    def _load(self):
+        if not os.path.exists(self.settings_path):
+            return
+        try:
+            with open(self.settings_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.monitor = int(data.get("monitor", 0))
+            region = data.get("region")
+            self.region = tuple(region) if region else None
+        except (OSError, ValueError, TypeError) as e:
+            print("[CAPTURE SETTINGS ERROR]", e)
+
+    def _save(self):
+        try:
+            with open(self.settings_path, "w", encoding="utf-8") as f:
+                json.dump({"monitor": self.monitor, "region": self.region}, f)
+        except OSError as e:
+            print("[CAPTURE SETTINGS ERROR]", e)
+
+
+capturer = ScreenCapturer()
@@ -0,0 +1,170 @@
+# speculative.py
+import os
+import re
+import time
+import threading
+
+from ai_engine import scheduler
+
+# Opt-in: speculative requests spend Gemini tokens on questions that may change.
+SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_ANSWERS", "0") == "1"
+SPECULATIVE_STABLE_MS = int(os.getenv("SPECULATIVE_STABLE_MS", "700"))
+SPECULATIVE_MIN_WORDS = 4
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace for matching."""
+    return " ".join(_PUNCT_RE.sub(" ", (text or "").lower()).split())
+
+
+def looks_like_question(text: str) -> bool:
+    return (text or "").rstrip().endswith("?")
+
+
+class SpeculativeAnswer:
+    """
+    A background answer stream for a transcript that may become the next question.
+
+    Chunks are buffered as they arrive so a later consumer can replay them
+    instantly and then keep following the live stream.
+    """
+
+    def __init__(self, chat, question):
+        self.question = question
+        self.key = normalize_question(question)
+        self.chunks = []
+        self.error = None
+        self.handle = scheduler.start(chat, question, remember=False, slot="speculative")
+        self._memory = chat[1]
+        self._done = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def request_id(self):
+        return self.handle.request_id
+
+    def _run(self):
+        try:
+            for chunk in self.handle:
+                with self._cond:
+                    self.chunks.append(chunk)
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    @property
+    def cancelled(self):
+        return self.handle.cancelled
+
+    def cancel(self):
+        self.handle.cancel()
+        with self._cond:
+            self._cond.notify_all()
+
+    def matches(self, question) -> bool:
+        return not self.cancelled and self.key == normalize_question(question)
+
+    def iter_chunks(self):
+        """Yield buffered chunks, then live ones; remembers the turn once complete."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.chunks) and not self._done and not self.cancelled:
+                    self._cond.wait()
+                pending = self.chunks[index:]
+                finished = self._done
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if self.cancelled:
+                return
+            if finished and index >= len(self.chunks):
+                break
+        if self.error:
+            raise self.error
+        self._memory.add_turn(self.question, "".join(self.chunks))
+
+
+class Speculator:
+    """
+    Watches partial transcripts and starts a speculative answer once the text
+    has been stable for ``stable_ms`` or already looks like a full question.
+    """
+
+    def __init__(self, chat, stable_ms=SPECULATIVE_STABLE_MS):
+        self.chat = chat
+        self.stable_ms = stable_ms
+        self.current = None
+        self._pending = None
+        self._changed_at = 0.0
+        self._stopped = threading.Event()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def on_transcript(self, text, is_final):
+        text = (text or "").strip()
+        if len(text.split()) < SPECULATIVE_MIN_WORDS:
+            return
+        with self._cond:
+            current = self.current
+            if current and not current.matches(text):
+                current.cancel()
+                self.current = None
+            if is_final or looks_like_question(text):
+                self._pending = None
+                start_now = True
+            else:
+                self._pending = text
+                self._changed_at = time.monotonic()
+                self._cond.notify()
+                start_now = False
+        if start_now:
+            self._start(text)
+
+    def _watch(self):
+        while not self._stopped.is_set():
+            with self._cond:
+                self._cond.wait(timeout=self.stable_ms / 1000.0)
+                text = self._pending
+                stable = text and (time.monotonic() - self._changed_at) * 1000 >= self.stable_ms
+                if stable:
+                    self._pending = None
+            if stable:
+                self._start(text)
+
+    def _start(self, text):
+        with self._cond:
+            if self._stopped.is_set() or (self.current and self.current.matches(text)):
+                return
+            if self.current:
+                self.current.cancel()
+            print(">> Speculating on:", text)
+            self.current = SpeculativeAnswer(self.chat, text)
+
+    def take(self, question):
+        """Return the speculative answer for ``question`` or cancel a stale one."""
+        with self._cond:
+            current, self.current = self.current, None
+            self._pending = None
+        if current and current.matches(question):
+            return current
+        if current:
+            current.cancel()
+        return None
+
+    def stop(self):
+        self._stopped.set()
+        with self._cond:
+            if self.current:
+                self.current.cancel()
+                self.current = None
+            self._cond.notify_all()
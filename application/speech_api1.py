@@ -4,9 +4,10 @@ import json
 import threading
 import sounddevice as sd
 from websocket import WebSocketApp, ABNF
-import requests
 import time
 
+from transcript_shipper import shipper
+
 # --- CONFIG (API_KEY is now passed in) ---
 AUDIO_SAMPLE_RATE = 16000
 AUDIO_ENCODING = "pcm_s16le"
@@ -24,35 +25,17 @@ IGNORED_NOISE_PHRASES = {
     "goodbye", "bye", "yes", "no", "done"
 }
 
-# Backend integration
-BACKEND_API_BASE = "http://127.0.0.1:8000"
-BACKEND_TOKEN = None
-
+# Backend integration: final utterances are batched and shipped by transcript_shipper
 def set_backend_token(token: str):
-    global BACKEND_TOKEN
-    BACKEND_TOKEN = token
-
-def get_backend_headers():
-    if not BACKEND_TOKEN:
-        return {}
-    return {"Authorization": f"Bearer {BACKEND_TOKEN}", "Content-Type": "application/json"}
+    shipper.set_token(token)
 
 def log_transcription_to_backend(text: str):
-    """Send transcription to backend /transcriptions/"""
-    if not BACKEND_TOKEN:
-        # skip if no backend token
-        print("[TRANSCRIPT LOG SKIP] no backend token")
-        return
-    try:
-        payload = {"transcript_text": text}
-        r = requests.post(f"{BACKEND_API_BASE}/transcriptions/", json=payload, headers=get_backend_headers(), timeout=8)
-        if r.status_code >= 400:
-            print("[TRANSCRIPT LOG ERROR]", r.status_code, r.text)
-        else:
-            # optional: print or ignore
-            print("[TRANSCRIPT LOGGED]", r.json())
-    except Exception as e:
-        print("[TRANSCRIPT LOG EXCEPTION]", e)
+    """Queue a transcription for the backend (POST /transcriptions/batch)."""
+    shipper.submit(text)
+
+def stop_transcript_shipper():
+    """Deliver queued transcriptions; undelivered ones stay in the spool file."""
+    shipper.stop()
 
 def get_audio_devices():
     """Returns a list of all available audio input devices."""
@@ -109,13 +92,9 @@ def start_transcription_thread(api_key, callback, stop_event, device_index):
                 callback(text, is_final)
             except Exception as e:
                 print("[CALLBACK ERROR]", e)
-            # asynchronously log to backend (fire-and-forget)
+            # queue for the backend; the shipper thread batches and sends it
             if is_final:
-                try:
-                    # spawn thread so we don't block WS handling
-                    threading.Thread(target=log_transcription_to_backend, args=(text,), daemon=True).start()
-                except Exception as e:
-                    print("[LOG THREAD ERROR]", e)
+                log_transcription_to_backend(text)
 
         def on_error(ws, error):
             print(f"[AAI ERROR] {error}")
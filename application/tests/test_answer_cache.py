@@ -0,0 +1,48 @@
+import json
+
+from answer_cache import AnswerCache
+
+CONTEXT = "resume"
+LONG_PROMPT = (
+    "Screen Question: Given an array of integers nums and an integer k, return the number of "
+    "contiguous subarrays whose sum is divisible by k. The array length is at most {n} and each "
+    "element lies between -10000 and 10000. Aim for linear time and constant extra space where possible."
+)
+
+
+def make_cache(tmp_path, **kwargs):
+    return AnswerCache(path=str(tmp_path / "answer_cache.json"), save_delay=0, **kwargs)
+
+
+def test_long_prompts_differing_in_one_number_miss(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(CONTEXT, LONG_PROMPT.format(n=30000), "answer for 30000")
+    assert cache.lookup(CONTEXT, LONG_PROMPT.format(n=50000)) is None
+    assert cache.lookup(CONTEXT, LONG_PROMPT.format(n=30000)) == "answer for 30000"
+
+
+def test_long_prompt_matches_after_whitespace_and_case_changes(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(CONTEXT, LONG_PROMPT.format(n=30000), "answer")
+    assert cache.lookup(CONTEXT, "  " + LONG_PROMPT.format(n=30000).upper().replace(" ", "\n ")) == "answer"
+
+
+def test_short_question_still_matches_by_similarity(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(CONTEXT, "What is the difference between a process and a thread?", "answer")
+    assert cache.lookup(CONTEXT, "so what is the difference between a process and a thread") == "answer"
+    assert cache.lookup("other resume", "What is the difference between a process and a thread?") is None
+
+
+def test_malformed_entries_are_skipped_on_load(tmp_path, capsys):
+    cache = make_cache(tmp_path)
+    cache.put(CONTEXT, "Tell me about yourself", "answer")
+    cache.flush()
+    path = tmp_path / "answer_cache.json"
+    entries = json.loads(path.read_text())
+    entries += [{"question": "old schema", "answer": "x", "created": 0}, "garbage", {"context": 1}]
+    path.write_text(json.dumps(entries))
+
+    reloaded = make_cache(tmp_path)
+    assert reloaded.lookup(CONTEXT, "Tell me about yourself") == "answer"
+    assert "skipped 3 malformed entries" in capsys.readouterr().out
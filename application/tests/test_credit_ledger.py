@@ -0,0 +1,73 @@
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("PyQt5")
+
+import credit_ledger  # noqa: E402
+from credit_ledger import CreditLedger  # noqa: E402
+
+
+class Response:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+class FakeClient:
+    """Backend stand-in; ``submit`` keeps work queued until ``run_pending``."""
+
+    def __init__(self, balances):
+        self.balances = balances  # token -> credits
+        self.queued = []
+
+    def get_credits(self, token):
+        return self.balances[token]
+
+    def reserve_credits(self, token, amount):
+        self.balances[token] -= amount
+        return Response(200, {"id": 1, "balance": self.balances[token]})
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.queued.append((future, fn, args))
+        return future
+
+    def run_pending(self):
+        while self.queued:
+            future, fn, args = self.queued.pop(0)
+            future.set_result(fn(*args))
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    fake = FakeClient({"alice": 2, "bob": 50})
+    monkeypatch.setattr(credit_ledger, "client", fake)
+    return fake
+
+
+def test_reset_forgets_the_previous_accounts_balance(backend):
+    ledger = CreditLedger()
+    ledger.refresh("alice")
+    assert ledger.preauthorize("alice").amount == 2
+    assert ledger.preauthorize("alice") is None  # alice has nothing left
+
+    ledger.reset()
+    assert ledger.balance is None and ledger.pending == 0
+    # bob's first answer is not judged by alice's balance
+    assert ledger.preauthorize("bob") is not None
+
+
+def test_replies_for_the_previous_account_are_ignored_after_reset(backend):
+    ledger = CreditLedger()
+    ledger.refresh("alice")
+    ledger.preauthorize("alice")  # alice's reservation is still in flight
+    ledger.reset()
+    ledger.refresh("bob")
+
+    backend.run_pending()  # alice's reservation reply arrives late
+    assert ledger.balance == 50 and ledger.pending == 0
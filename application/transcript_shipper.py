@@ -0,0 +1,217 @@
+# transcript_shipper.py
+import os
+import json
+import time
+import queue
+import threading
+
+from backend_client import client, token_owner
+
+TRANSCRIPT_BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", "20"))
+TRANSCRIPT_FLUSH_SECONDS = float(os.getenv("TRANSCRIPT_FLUSH_SECONDS", "5"))
+TRANSCRIPT_QUEUE_SIZE = 1000
+# How often the worker retries the spool while no new utterances arrive
+TRANSCRIPT_SPOOL_RETRY_SECONDS = float(os.getenv("TRANSCRIPT_SPOOL_RETRY_SECONDS", "30"))
+# Utterances that could not be delivered wait here until the backend is back.
+TRANSCRIPT_SPOOL_FILE = "transcript_spool.jsonl"
+# Responses that drop a batch for good; any other error keeps it in the spool
+FINAL_REJECTIONS = (400, 413, 422)
+
+
+class TranscriptShipper:
+    """
+    Ships final utterances to the backend from a single worker thread.
+
+    Utterances are queued (bounded) and posted in batches to
+    POST /transcriptions/batch once ``batch_size`` are waiting or
+    ``flush_seconds`` have passed. Batches that cannot be delivered are
+    appended to a spool file and retried before the next batch, when the
+    worker starts and every ``retry_seconds``, so offline periods are not lost.
+    Every utterance records the account it was spoken under (token_owner) and
+    is only ever sent with that account's token; other users' spooled
+    utterances stay on disk until that user logs in again.
+    """
+
+    def __init__(self, batch_size=TRANSCRIPT_BATCH_SIZE, flush_seconds=TRANSCRIPT_FLUSH_SECONDS,
+                 spool_path=TRANSCRIPT_SPOOL_FILE, maxsize=TRANSCRIPT_QUEUE_SIZE,
+                 retry_seconds=TRANSCRIPT_SPOOL_RETRY_SECONDS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.spool_path = spool_path
+        self.retry_seconds = retry_seconds
+        self.token = None
+        self.owner = None
+        self.batch_supported = True
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._spool_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def set_token(self, token):
+        self.token = token
+        self.owner = token_owner(token)
+        if token:
+            # Starting the worker retries whatever this user has spooled
+            self._ensure_started()
+
+    def submit(self, text):
+        """Queue an utterance; never blocks the caller."""
+        self._ensure_started()
+        item = {"transcript_text": text, "owner": self.owner}
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Worker is behind (backend slow or down): keep it on disk instead.
+            self._spool([item])
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="transcript-shipper", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Flush what is queued and stop the worker."""
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        next_retry = time.monotonic()
+        while True:
+            timeout = 0.5 if deadline is None else min(0.5, max(0.0, deadline - time.monotonic()))
+            try:
+                item = self._queue.get(timeout=timeout)
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+            except queue.Empty:
+                pass
+            stopping = self._stop.is_set()
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or stopping):
+                if stopping:
+                    batch.extend(self._drain_queue())
+                self._flush(batch)
+                batch, deadline = [], None
+                next_retry = time.monotonic() + self.retry_seconds
+            elif not batch and not stopping and time.monotonic() >= next_retry:
+                if os.path.exists(self.spool_path):
+                    self._flush([])
+                next_retry = time.monotonic() + self.retry_seconds
+            if stopping and self._queue.empty():
+                return
+
+    def _drain_queue(self):
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _flush(self, batch):
+        if not self.token:
+            if batch:
+                print("[TRANSCRIPT LOG SKIP] no backend token")
+            return
+        owner = self.owner
+        # Queued before an account switch: keep for its own user.
+        others = [item for item in batch if item.get("owner") != owner]
+        if others:
+            self._spool(others)
+        # Older undelivered utterances go first so the log stays in order.
+        pending = self._take_spool(owner) + [item for item in batch if item.get("owner") == owner]
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            delivered = self._send(chunk)
+            if delivered < len(chunk):
+                self._spool(pending[start + delivered:])
+                return
+
+    def _send(self, items):
+        """Post ``items``; returns how many of them were delivered (in order)."""
+        delivered = 0
+        try:
+            if self.batch_supported:
+                r = client.log_transcriptions(self.token, [{"transcript_text": i["transcript_text"]} for i in items])
+                if r.status_code in (404, 405):
+                    print("[TRANSCRIPT LOG] backend has no /transcriptions/batch, posting one by one")
+                    self.batch_supported = False
+                else:
+                    return len(items) if self._delivered(r, len(items)) else 0
+            for item in items:
+                r = client.log_transcription(self.token, item["transcript_text"])
+                if not self._delivered(r, 1):
+                    break
+                delivered += 1
+        except Exception as e:
+            print("[TRANSCRIPT LOG EXCEPTION]", e)
+        return delivered
+
+    @staticmethod
+    def _delivered(r, count):
+        if r.status_code in FINAL_REJECTIONS:
+            # The payload itself was refused; retrying will not help.
+            print("[TRANSCRIPT LOG REJECTED]", r.status_code, r.text)
+            return True
+        if r.status_code >= 400:
+            # Expired token, rate limit, timeout or server error: keep it for later.
+            print("[TRANSCRIPT LOG ERROR]", r.status_code)
+            return False
+        print(f"[TRANSCRIPT LOGGED] {count} utterance(s)")
+        return True
+
+    def _spool(self, items):
+        with self._spool_lock:
+            try:
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for item in items:
+                        f.write(json.dumps(item) + "\n")
+            except OSError as e:
+                print("[TRANSCRIPT SPOOL ERROR]", e)
+
+    def _take_spool(self, owner):
+        """Remove and return ``owner``'s spooled utterances; other users' stay in the file."""
+        with self._spool_lock:
+            if not os.path.exists(self.spool_path):
+                return []
+            items, others, unowned = [], [], 0
+            try:
+                with open(self.spool_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not isinstance(item, dict) or "transcript_text" not in item:
+                            continue
+                        if not item.get("owner"):
+                            # Spooled by an older build: the account is unknown
+                            unowned += 1
+                        elif item["owner"] == owner:
+                            items.append(item)
+                        else:
+                            others.append(item)
+                if others:
+                    tmp_path = self.spool_path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        for item in others:
+                            f.write(json.dumps(item) + "\n")
+                    os.replace(tmp_path, self.spool_path)
+                else:
+                    os.remove(self.spool_path)
+            except OSError as e:
+                print("[TRANSCRIPT SPOOL ERROR]", e)
+            if unowned:
+                print(f"[TRANSCRIPT SPOOL] dropped {unowned} utterance(s) with no account")
+            if items:
+                print(f"[TRANSCRIPT SPOOL] retrying {len(items)} utterance(s)")
+            return items
+
+
+shipper = TranscriptShipper()
@@ -1,40 +1,54 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database.connection import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.connection import AsyncSessionLocal
 from app.models.user import User
 from app.core.security import verify_access_token
+from app.core.identity_cache import Identity, get_identity, put_identity, invalidate_user
 
 # OAuth2 scheme for JWT token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    
+def _unauthorized(detail: str):
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail
+    )
+
+async def get_current_identity(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Identity:
+    """
+    Resolve the token to a cached Identity; the users table is only queried on
+    a cache miss. Use this for endpoints that need no more than the user's id.
+    """
     username = verify_access_token(token)
     if not username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
-    user = db.query(User).filter(User.username == username).first()
+        raise _unauthorized("Invalid or expired token")
+    identity = get_identity(username)
+    if identity is None:
+        user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+        if not user:
+            raise _unauthorized("User not found")
+        identity = put_identity(user)
+    return identity
+
+async def get_current_user(identity: Identity = Depends(get_current_identity), db: AsyncSession = Depends(get_db)) -> User:
+    # Primary-key load (served from the session identity map when possible)
+    user = await db.get(User, identity.id)
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+        invalidate_user(identity.username)
+        raise _unauthorized("User not found")
     return user
 
-def get_current_admin(current_user: User = Depends(get_current_user)):
-    if not current_user.is_admin:
+async def get_current_admin(identity: Identity = Depends(get_current_identity)) -> Identity:
+    # The admin flag is part of the cached identity; admin changes invalidate it
+    if not identity.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admins only!"
         )
-    return current_user
\ No newline at end of file
+    return identity
@@ -0,0 +1,56 @@
+import os
+import time
+import threading
+
+# How long a resolved token subject is trusted without looking the user up again.
+# Admin changes invalidate entries immediately; the TTL bounds staleness across
+# multiple worker processes.
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "60"))
+
+
+class Identity:
+    """The parts of a User needed to authenticate and authorize a request."""
+
+    __slots__ = ("id", "username", "is_admin", "is_active")
+
+    def __init__(self, id: int, username: str, is_admin: bool, is_active: bool):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+        self.is_active = is_active
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, bool(user.is_admin), bool(user.is_active))
+
+
+_entries = {}  # username -> (expires_at, Identity)
+_lock = threading.Lock()
+
+
+def get_identity(username: str):
+    with _lock:
+        entry = _entries.get(username)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _entries[username]
+            return None
+        return entry[1]
+
+
+def put_identity(user) -> Identity:
+    identity = Identity.from_user(user)
+    with _lock:
+        _entries[user.username] = (time.monotonic() + IDENTITY_CACHE_TTL, identity)
+    return identity
+
+
+def invalidate_user(username: str):
+    with _lock:
+        _entries.pop(username, None)
+
+
+def clear_identity_cache():
+    with _lock:
+        _entries.clear()
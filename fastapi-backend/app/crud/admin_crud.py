@@ -0,0 +1,63 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.payment import Payment
+from app.models.user import User
+from app.crud.pagination import clamp_limit, fetch_rows, keyset_queries, page_of
+
+USER_SORTS = {"id": User.id, "username": User.username, "credits": User.credits}
+PAYMENT_SORTS = {"timestamp": Payment.timestamp, "id": Payment.id, "amount": Payment.amount}
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def list_users_page(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    order: str = "desc",
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None,
+    username_prefix: Optional[str] = None,
+):
+    limit = clamp_limit(limit)
+    descending = order == "desc"
+    # Projection: only the columns the admin table shows
+    stmt = select(User.id, User.username, User.email, User.is_active, User.is_admin, User.credits)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    if is_admin is not None:
+        stmt = stmt.where(User.is_admin == is_admin)
+    if username_prefix:
+        stmt = stmt.where(User.username.like(_escape_like(username_prefix) + "%", escape="\\"))
+    queries = keyset_queries(stmt, USER_SORTS[sort], User.id, cursor, limit, descending)
+    return page_of(await fetch_rows(db, queries, limit), limit, sort)
+
+
+async def list_payments_page(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = "timestamp",
+    order: str = "desc",
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    username_prefix: Optional[str] = None,
+):
+    limit = clamp_limit(limit)
+    descending = order == "desc"
+    stmt = (
+        select(Payment.id, Payment.user_id, User.username, User.email, Payment.amount, Payment.status, Payment.timestamp)
+        .outerjoin(User, User.id == Payment.user_id)
+    )
+    if status:
+        stmt = stmt.where(Payment.status == status)
+    if user_id is not None:
+        stmt = stmt.where(Payment.user_id == user_id)
+    if username_prefix:
+        stmt = stmt.where(User.username.like(_escape_like(username_prefix) + "%", escape="\\"))
+    queries = keyset_queries(stmt, PAYMENT_SORTS[sort], Payment.id, cursor, limit, descending)
+    return page_of(await fetch_rows(db, queries, limit), limit, sort)
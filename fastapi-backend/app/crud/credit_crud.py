@@ -1,25 +1,194 @@
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.credit import Credit
+from app.models.credit_reservation import CreditReservation
 from app.models.user import User
+from app.crud.dashboard_aggregates import record_credit_delta
 
-def add_credits(db: Session, user: User, amount: int):
+# Balances are only ever changed by a single UPDATE relative to the stored
+# value (credits = credits + :delta), never by writing back a value computed in
+# Python, so concurrent requests cannot overwrite each other's changes.
+#
+# ``user`` is either a User or the cached Identity from get_current_identity;
+# only its id is read. The balance an update returned is kept in the session
+# (see current_balance) so routes can report it without loading the User.
+
+async def change_credits(db: AsyncSession, user: User, delta: int, require_balance: bool = False):
+    """
+    Add ``delta`` to the user's balance in the current transaction. With
+    ``require_balance`` the update only applies if the balance stays >= 0
+    (UPDATE ... WHERE credits >= -delta). Returns False if it did not apply.
+    The stored balance is remembered for current_balance (and written to
+    ``user.credits`` when ``user`` is a User).
+    """
+    await db.flush()  # autoflush is off: write pending ORM changes first
+    stmt = update(User).where(User.id == user.id)
+    if require_balance:
+        stmt = stmt.where(User.credits >= -delta)
+    stmt = stmt.values(credits=User.credits + delta).execution_options(synchronize_session=False)
+    if db.get_bind().dialect.update_returning:
+        balance = (await db.execute(stmt.returning(User.credits))).scalar()
+        if balance is None:
+            return False
+    else:
+        # e.g. MySQL: the row stays locked by our UPDATE, so the re-read is exact
+        if (await db.execute(stmt)).rowcount != 1:
+            return False
+        balance = (await db.execute(select(User.credits).where(User.id == user.id))).scalar()
+    if isinstance(user, User):
+        set_committed_value(user, "credits", balance)
+    db.info.setdefault("balances", {})[user.id] = balance
+    record_credit_delta(db.sync_session, delta)
+    return True
+
+async def add_credits(db: AsyncSession, user: User, amount: int):
     # Update user's total credits
-    user.credits += amount
+    await change_credits(db, user, amount)
     db_credit = Credit(user_id=user.id, amount=amount)
     db.add(db_credit)
-    db.commit()
-    db.refresh(db_credit)
+    await db.commit()
+    await db.refresh(db_credit)
     return db_credit
 
-def deduct_credits(db: Session, user: User, amount: int):
-    if user.credits < amount:
+async def apply_deduction(db: AsyncSession, user: User, amount: int):
+    """
+    Deduct ``amount`` if the balance covers it and stage the ledger row, in the
+    current transaction without committing it.
+    """
+    if not await change_credits(db, user, -amount, require_balance=True):
         return None
-    user.credits -= amount
     db_credit = Credit(user_id=user.id, amount=-amount)
     db.add(db_credit)
-    db.commit()
-    db.refresh(db_credit)
     return db_credit
 
-def get_user_credits(db: Session, user: User):
+async def deduct_credits(db: AsyncSession, user: User, amount: int):
+    db_credit = await apply_deduction(db, user, amount)
+    if db_credit is None:
+        return None
+    await db.commit()
+    await db.refresh(db_credit)
+    return db_credit
+
+def get_user_credits(db: AsyncSession, user: User):
     return user.credits
+
+async def get_balance(db: AsyncSession, user_id: int):
+    """Balance by user id, reading only the credits column."""
+    return (await db.execute(select(User.credits).where(User.id == user_id))).scalar() or 0
+
+async def current_balance(db: AsyncSession, user):
+    """Balance after this session's last change_credits; read from the database if it made none."""
+    balance = db.info.get("balances", {}).get(user.id)
+    if balance is None:
+        balance = await get_balance(db, user.id)
+    return balance
+
+# Reservations hold credits while an answer is generated; unsettled holds are
+# returned to the user once they expire (e.g. the desktop app crashed).
+RESERVATION_TTL = timedelta(minutes=5)
+
+async def claim_reservation(db: AsyncSession, reservation: CreditReservation, status: str):
+    """
+    Move a held reservation to ``status`` (UPDATE ... WHERE status = 'held').
+    Returns False if a concurrent request already closed it.
+    """
+    await db.flush()
+    result = await db.execute(
+        update(CreditReservation)
+        .where(CreditReservation.id == reservation.id, CreditReservation.status == "held")
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    set_committed_value(reservation, "status", status)
+    return True
+
+async def release_expired_reservations(db: AsyncSession, user: User):
+    expired = (await db.execute(select(CreditReservation).where(
+        CreditReservation.user_id == user.id,
+        CreditReservation.status == "held",
+        CreditReservation.expires_at < datetime.utcnow(),
+    ))).scalars().all()
+    refund = 0
+    for reservation in expired:
+        if await claim_reservation(db, reservation, "expired"):
+            refund += reservation.amount
+    if refund:
+        await change_credits(db, user, refund)
+    return len(expired)
+
+async def reserve_credits(db: AsyncSession, user: User, amount: int):
+    if amount <= 0:
+        # A negative hold would pass the balance check and credit the user
+        raise ValueError("reservation amount must be positive")
+    await release_expired_reservations(db, user)
+    if not await change_credits(db, user, -amount, require_balance=True):
+        await db.commit()
+        return None
+    reservation = CreditReservation(
+        user_id=user.id,
+        amount=amount,
+        status="held",
+        expires_at=datetime.utcnow() + RESERVATION_TTL,
+    )
+    db.add(reservation)
+    await db.commit()
+    await db.refresh(reservation)
+    return reservation
+
+async def get_held_reservation(db: AsyncSession, user: User, reservation_id: int):
+    return (await db.execute(select(CreditReservation).where(
+        CreditReservation.id == reservation_id,
+        CreditReservation.user_id == user.id,
+        CreditReservation.status == "held",
+    ))).scalars().first()
+
+async def apply_settlement(db: AsyncSession, user: User, reservation: CreditReservation, amount: int):
+    """
+    Stage the settlement of a hold without committing it. Returns the amount
+    charged, or None if the reservation was closed by a concurrent request.
+    """
+    if amount < 0:
+        # A negative charge would "refund" more than was held
+        raise ValueError("settlement amount must not be negative")
+    if not await claim_reservation(db, reservation, "settled"):
+        return None
+    # Refund the unused part of the hold; if the answer cost more than was held,
+    # charge the difference as far as the balance allows.
+    charged = min(amount, reservation.amount)
+    if reservation.amount > charged:
+        await change_credits(db, user, reservation.amount - charged)
+    extra = amount - charged
+    while extra > 0:
+        balance = (await db.execute(select(User.credits).where(User.id == user.id))).scalar() or 0
+        take = min(extra, balance)
+        if take <= 0:
+            break
+        # Conditional, so a concurrent spend between the read and here cannot overdraw
+        if await change_credits(db, user, -take, require_balance=True):
+            charged += take
+            break
+    reservation.settled_amount = charged
+    db.add(Credit(user_id=user.id, amount=-charged))
+    return charged
+
+async def settle_reservation(db: AsyncSession, user: User, reservation: CreditReservation, amount: int):
+    if await apply_settlement(db, user, reservation, amount) is None:
+        await db.rollback()
+        return None
+    await db.commit()
+    await db.refresh(reservation)
+    return reservation
+
+async def release_reservation(db: AsyncSession, user: User, reservation: CreditReservation):
+    if not await claim_reservation(db, reservation, "released"):
+        await db.rollback()
+        return None
+    await change_credits(db, user, reservation.amount)
+    reservation.settled_amount = 0
+    await db.commit()
+    await db.refresh(reservation)
+    return reservation
@@ -0,0 +1,258 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import Date, case, cast, event, func, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.credit import Credit
+from app.models.payment import Payment
+from app.models.response_log import ResponseLog
+from app.models.user import User
+
+# Totals are kept in memory and updated from committed ORM changes. A full
+# resync from the database runs at most this often, which also corrects drift
+# from writes made by other worker processes.
+DASHBOARD_RESYNC_SECONDS = float(os.getenv("DASHBOARD_RESYNC_SECONDS", "300"))
+# Days of daily series kept (revenue, credits spent, active users)
+DASHBOARD_SERIES_DAYS = int(os.getenv("DASHBOARD_SERIES_DAYS", "30"))
+
+_PENDING_KEY = "dashboard_deltas"
+
+
+def _empty_totals():
+    return {
+        "total_users": 0,
+        "active_users": 0,
+        "admin_users": 0,
+        "total_credits": 0,
+        "total_revenue": 0.0,
+        "total_payments": 0,
+    }
+
+
+def _empty_bucket():
+    return {"revenue": 0.0, "payments": 0, "credits_spent": 0, "active_users": set()}
+
+
+class DashboardAggregates:
+    """In-memory dashboard totals and daily buckets, served in O(1)."""
+
+    def __init__(self, resync_seconds=DASHBOARD_RESYNC_SECONDS, series_days=DASHBOARD_SERIES_DAYS):
+        self.resync_seconds = resync_seconds
+        self.series_days = series_days
+        self.totals = _empty_totals()
+        self.daily = {}  # date -> bucket
+        self.synced_at = None
+        self._lock = threading.Lock()
+
+    def is_stale(self):
+        return self.synced_at is None or time.monotonic() - self.synced_at > self.resync_seconds
+
+    # --- reads ---------------------------------------------------------
+
+    async def snapshot(self, db: AsyncSession):
+        if self.is_stale():
+            await self.resync(db)
+        with self._lock:
+            return dict(self.totals)
+
+    async def series(self, db: AsyncSession, days: int):
+        if self.is_stale():
+            await self.resync(db)
+        days = max(1, min(days, self.series_days))
+        today = datetime.utcnow().date()
+        with self._lock:
+            result = []
+            for offset in range(days - 1, -1, -1):
+                day = today - timedelta(days=offset)
+                bucket = self.daily.get(day) or _empty_bucket()
+                result.append({
+                    "date": day.isoformat(),
+                    "revenue": bucket["revenue"],
+                    "payments": bucket["payments"],
+                    "credits_spent": bucket["credits_spent"],
+                    "active_users": len(bucket["active_users"]),
+                })
+            return result
+
+    # --- full resync ---------------------------------------------------
+
+    async def resync(self, db: AsyncSession):
+        users = (await db.execute(select(
+            func.count(User.id),
+            func.sum(case((User.is_active == True, 1), else_=0)),  # noqa: E712
+            func.sum(case((User.is_admin == True, 1), else_=0)),  # noqa: E712
+            func.sum(User.credits),
+        ))).one()
+        payments = (await db.execute(select(func.count(Payment.id), func.sum(Payment.amount)))).one()
+        totals = {
+            "total_users": users[0] or 0,
+            "active_users": int(users[1] or 0),
+            "admin_users": int(users[2] or 0),
+            "total_credits": int(users[3] or 0),
+            "total_revenue": float(payments[1] or 0.0),
+            "total_payments": payments[0] or 0,
+        }
+
+        since = datetime.combine(datetime.utcnow().date() - timedelta(days=self.series_days - 1), datetime.min.time())
+        daily = {}
+
+        def bucket(day):
+            if isinstance(day, str):
+                day = date.fromisoformat(day)
+            elif isinstance(day, datetime):
+                day = day.date()
+            return daily.setdefault(day, _empty_bucket())
+
+        pay_day = _day(db, Payment.timestamp)
+        rows = await db.execute(
+            select(pay_day, func.count(Payment.id), func.sum(Payment.amount))
+            .where(Payment.timestamp >= since).group_by(pay_day)
+        )
+        for day, count, amount in rows:
+            b = bucket(day)
+            b["payments"], b["revenue"] = count, float(amount or 0.0)
+
+        credit_day = _day(db, Credit.timestamp)
+        rows = await db.execute(
+            select(credit_day, func.sum(-Credit.amount))
+            .where(Credit.timestamp >= since, Credit.amount < 0).group_by(credit_day)
+        )
+        for day, spent in rows:
+            bucket(day)["credits_spent"] = int(spent or 0)
+
+        log_day = _day(db, ResponseLog.timestamp)
+        rows = await db.execute(
+            select(log_day, ResponseLog.user_id).where(ResponseLog.timestamp >= since).distinct()
+        )
+        for day, user_id in rows:
+            bucket(day)["active_users"].add(user_id)
+
+        with self._lock:
+            self.totals = totals
+            self.daily = daily
+            self.synced_at = time.monotonic()
+
+    # --- incremental updates -------------------------------------------
+
+    def apply(self, deltas):
+        if self.synced_at is None:
+            return  # nothing loaded yet; the first read resyncs anyway
+        with self._lock:
+            for key, value in deltas["totals"].items():
+                self.totals[key] += value
+            cutoff = datetime.utcnow().date() - timedelta(days=self.series_days - 1)
+            for day, changes in deltas["daily"].items():
+                if day < cutoff:
+                    continue
+                b = self.daily.setdefault(day, _empty_bucket())
+                b["revenue"] += changes["revenue"]
+                b["payments"] += changes["payments"]
+                b["credits_spent"] += changes["credits_spent"]
+                b["active_users"] |= changes["active_users"]
+            for day in [d for d in self.daily if d < cutoff]:
+                del self.daily[day]
+
+    def invalidate(self):
+        self.synced_at = None
+
+
+def _day(db, column):
+    # CAST(... AS DATE) is not a calendar date on SQLite; use its date() instead
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+dashboard_aggregates = DashboardAggregates()
+
+
+# --- change capture from ORM flushes ----------------------------------------
+
+def _pending(session):
+    deltas = session.info.get(_PENDING_KEY)
+    if deltas is None:
+        deltas = {"totals": {k: 0 for k in _empty_totals()}, "daily": {}}
+        session.info[_PENDING_KEY] = deltas
+    return deltas
+
+
+def _day_changes(deltas, when):
+    day = (when or datetime.utcnow()).date()
+    return deltas["daily"].setdefault(day, _empty_bucket())
+
+
+def record_credit_delta(session, delta: int):
+    """
+    Note a change to users.credits made with a Core UPDATE (the ORM flush hook
+    only sees changes made through mapped attributes).
+    """
+    _pending(session)["totals"]["total_credits"] += delta
+
+
+def _attr_delta(obj, name):
+    history = sa_inspect(obj).attrs[name].history
+    if not history.has_changes():
+        return None
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_flush(session, flush_context):
+    deltas = _pending(session)
+    totals = deltas["totals"]
+    for obj in session.new:
+        if isinstance(obj, User):
+            totals["total_users"] += 1
+            totals["active_users"] += 1 if obj.is_active else 0
+            totals["admin_users"] += 1 if obj.is_admin else 0
+            totals["total_credits"] += obj.credits or 0
+        elif isinstance(obj, Payment):
+            totals["total_payments"] += 1
+            totals["total_revenue"] += obj.amount or 0
+            day = _day_changes(deltas, obj.timestamp)
+            day["payments"] += 1
+            day["revenue"] += obj.amount or 0
+        elif isinstance(obj, Credit):
+            if obj.amount < 0:
+                _day_changes(deltas, obj.timestamp)["credits_spent"] += -obj.amount
+        elif isinstance(obj, ResponseLog):
+            _day_changes(deltas, obj.timestamp)["active_users"].add(obj.user_id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            totals["total_users"] -= 1
+            totals["active_users"] -= 1 if obj.is_active else 0
+            totals["admin_users"] -= 1 if obj.is_admin else 0
+            totals["total_credits"] -= obj.credits or 0
+        elif isinstance(obj, Payment):
+            totals["total_payments"] -= 1
+            totals["total_revenue"] -= obj.amount or 0
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            change = _attr_delta(obj, "credits")
+            if change:
+                totals["total_credits"] += (change[1] or 0) - (change[0] or 0)
+            for name, key in (("is_active", "active_users"), ("is_admin", "admin_users")):
+                change = _attr_delta(obj, name)
+                if change and bool(change[0]) != bool(change[1]):
+                    totals[key] += 1 if change[1] else -1
+        elif isinstance(obj, Payment):
+            change = _attr_delta(obj, "amount")
+            if change:
+                totals["total_revenue"] += (change[1] or 0) - (change[0] or 0)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session):
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if deltas is not None:
+        dashboard_aggregates.apply(deltas)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
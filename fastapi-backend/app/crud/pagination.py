@@ -0,0 +1,117 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """Opaque cursor pointing just after the row with (sort_value, row_id)."""
+    if isinstance(sort_value, datetime):
+        sort_value = {"dt": sort_value.isoformat()}
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value["dt"])
+        elif not (sort_value is None or isinstance(sort_value, (str, int, float))):
+            raise TypeError("unsupported sort value")
+        if isinstance(row_id, bool):
+            raise TypeError("bad row id")
+        row_id = int(row_id)
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor")
+    return sort_value, row_id
+
+
+def _after(column, value, descending: bool):
+    return column < value if descending else column > value
+
+
+def _nullable(column) -> bool:
+    return bool(getattr(column, "nullable", False)) and not getattr(column, "primary_key", False)
+
+
+def keyset_after(sort_column, id_column, sort_value, row_id: int, descending: bool):
+    """
+    WHERE clause for the rows after (sort_value, row_id) in (sort_column,
+    id_column) order. Ties on the sort column are broken by id, so pages never
+    skip or repeat rows.
+    """
+    return or_(
+        _after(sort_column, sort_value, descending),
+        and_(sort_column == sort_value, _after(id_column, row_id, descending)),
+    )
+
+
+def keyset_order(sort_column, id_column, descending: bool):
+    if descending:
+        return (sort_column.desc(), id_column.desc())
+    return (sort_column.asc(), id_column.asc())
+
+
+def keyset_queries(stmt, sort_column, id_column, cursor, limit: int, descending: bool):
+    """
+    Statements that together return the page of ``stmt`` after ``cursor``.
+
+    Rows are ordered by (sort_column, id_column); when the sort column is
+    nullable, rows where it is NULL follow in id order, in either direction.
+    The two parts are separate range scans on the plain columns (rather than
+    a COALESCE or NULLS LAST expression) so an index on (sort_column, id)
+    stays usable. A cursor whose sort value is null points into the NULL tail.
+    Run them in order with fetch_rows.
+    """
+    nullable = _nullable(sort_column)
+    sort_value, row_id = decode_cursor(cursor) if cursor else (None, None)
+    in_null_tail = cursor is not None and sort_value is None
+    if in_null_tail and not nullable:
+        raise InvalidCursor("Invalid cursor")
+
+    queries = []
+    if not in_null_tail:
+        head = stmt
+        if nullable:
+            head = head.where(sort_column.isnot(None))
+        if cursor:
+            head = head.where(keyset_after(sort_column, id_column, sort_value, row_id, descending))
+        queries.append(head.order_by(*keyset_order(sort_column, id_column, descending)).limit(limit + 1))
+    if nullable:
+        tail = stmt.where(sort_column.is_(None))
+        if in_null_tail:
+            tail = tail.where(_after(id_column, row_id, descending))
+        order = id_column.desc() if descending else id_column.asc()
+        queries.append(tail.order_by(order).limit(limit + 1))
+    return queries
+
+
+async def fetch_rows(db, queries, limit: int):
+    """Rows of ``queries`` in order, up to the ``limit + 1`` page_of needs."""
+    rows = []
+    for query in queries:
+        if len(rows) > limit:
+            break
+        rows += [dict(row) for row in (await db.execute(query)).mappings()]
+    return rows[:limit + 1]
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def page_of(rows, limit: int, sort_key: str):
+    """Split ``limit + 1`` fetched rows into a page and the cursor for the next one."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][sort_key], rows[-1]["id"]) if has_more and rows else None
+    return {"items": rows, "next_cursor": next_cursor, "limit": limit}
@@ -1,22 +1,26 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.payment import Payment
-from app.models.user import User
+from app.crud.credit_crud import change_credits
 from typing import Union
 
-def create_payment(db: Session, user: User, amount: Union[int, float], status="pending"):
+async def create_payment(db: AsyncSession, user, amount: Union[int, float], status="pending"):
     payment = Payment(user_id=user.id, amount=amount, status=status)
     db.add(payment)
     if status == "completed":
         credits_to_add = int(amount * 10)  # 1 USD = 10 credits (convert to int for credits)
-        user.credits += credits_to_add
+        await change_credits(db, user, credits_to_add)
     
-    db.commit()
-    db.refresh(payment)
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(payment)
     return payment
 
-def update_payment_status(db: Session, payment: Payment, status: str):
+async def get_user_payments(db: AsyncSession, user_id: int):
+    # Explicit query: lazy relationship loads are not available on AsyncSession
+    return (await db.execute(select(Payment).where(Payment.user_id == user_id))).scalars().all()
+
+async def update_payment_status(db: AsyncSession, payment: Payment, status: str):
     payment.status = status
-    db.commit()
-    db.refresh(payment)
+    await db.commit()
+    await db.refresh(payment)
     return payment
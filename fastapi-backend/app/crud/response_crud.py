@@ -1,15 +1,41 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.response_log import ResponseLog
 from app.models.user import User
-from app.crud.credit_crud import deduct_credits
+from app.crud.credit_crud import apply_deduction, apply_settlement, get_held_reservation
 
-def create_response(db: Session, user: User, query: str, ai_response: str, tokens_used: int):
-    # Deduct credits for AI usage
-    if deduct_credits(db, user, tokens_used) is None:
-        return None  # Not enough credits
-    
+async def create_response(db: AsyncSession, user, query: str, ai_response: str, tokens_used: int):
+    # ``user`` may be a User or a cached Identity; only its id is used.
+    # Log only: credits are charged by /credits/deduct or /responses/charge,
+    # charging here as well billed every answer twice.
     log = ResponseLog(user_id=user.id, query=query, ai_response=ai_response, tokens_used=tokens_used)
     db.add(log)
-    db.commit()
-    db.refresh(log)
+    await db.commit()
+    await db.refresh(log)
     return log
+
+async def charge_and_log(db: AsyncSession, user, query: str, ai_response: str, tokens_used: int,
+                         reservation_id: int = None):
+    """
+    Deduct credits (or settle a held reservation) and write the ResponseLog in
+    one transaction. Returns ``(log, charged)``, or ``(None, 0)`` if the user
+    cannot pay and nothing was written. ``user`` may be a User or an Identity.
+    """
+    reservation = await get_held_reservation(db, user, reservation_id) if reservation_id is not None else None
+    charged = None
+    if reservation is not None:
+        # None when a concurrent request closed the hold first; charge directly then
+        charged = await apply_settlement(db, user, reservation, tokens_used)
+    if charged is None:
+        if tokens_used <= 0:
+            charged = 0  # unbilled answers (e.g. served from the client cache)
+        elif await apply_deduction(db, user, tokens_used) is not None:
+            charged = tokens_used
+        else:
+            await db.rollback()
+            return None, 0
+
+    log = ResponseLog(user_id=user.id, query=query, ai_response=ai_response, tokens_used=tokens_used)
+    db.add(log)
+    await db.commit()
+    await db.refresh(log)
+    return log, charged
@@ -1,9 +1,32 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.transcription_log import TranscriptionLog
 
-def create_transcription(db: Session, user_id: int, transcript_text: str):
+async def create_transcription(db: AsyncSession, user_id: int, transcript_text: str):
     log = TranscriptionLog(user_id=user_id, transcript_text=transcript_text)
     db.add(log)
-    db.commit()
-    db.refresh(log)
+    await db.commit()
+    await db.refresh(log)
     return log
+
+async def create_transcriptions(db: AsyncSession, user_id: int, transcript_texts):
+    """Insert many transcripts in one transaction and return their ids, in order."""
+    rows = [{"user_id": user_id, "transcript_text": text} for text in transcript_texts]
+    if not rows:
+        return []
+    dialect = db.get_bind().dialect
+    if getattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False):
+        # One multi-row INSERT ... RETURNING id; no per-row refresh
+        result = await db.execute(
+            insert(TranscriptionLog).returning(TranscriptionLog.id, sort_by_parameter_order=True),
+            rows,
+        )
+        ids = list(result.scalars())
+    else:
+        # e.g. MySQL has no RETURNING: one flush, ids come back from the cursor
+        logs = [TranscriptionLog(**row) for row in rows]
+        db.add_all(logs)
+        await db.flush()
+        ids = [log.id for log in logs]
+    await db.commit()
+    return ids
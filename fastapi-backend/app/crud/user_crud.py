@@ -1,19 +1,27 @@
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate
 from passlib.hash import bcrypt
 from app.core.auth import hash_password, verify_password
 
-def create_user(db: Session, user: UserCreate):
-    hashed_pw = hash_password(user.password)
+# bcrypt is deliberately slow; hashing runs in the threadpool so it does not
+# stall the event loop.
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_pw = await run_in_threadpool(hash_password, user.password)
     db_user = User(username=user.username, email=user.email, password=hashed_pw, is_admin=user.is_admin, credits=user.credits, is_active=user.is_active)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.password):
+async def get_user_by_username(db: AsyncSession, username: str):
+    return (await db.execute(select(User).where(User.username == username))).scalars().first()
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username)
+    if not user or not await run_in_threadpool(verify_password, password, user.password):
         return False
     return user
@@ -1,13 +1,13 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
 import re
+from app.core import settings
+from app.database.pool import MeteredAsyncQueuePool, MeteredQueuePool, PoolMetrics
 
-load_dotenv()
-
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.DATABASE_URL
 
 
 def get_db_name(database_url: str):
@@ -21,6 +21,31 @@ def should_auto_create_db(database_url: str) -> bool:
     return bool(database_url and database_url.startswith("mysql"))
 
 
+# Async driver for each sync URL scheme we deploy with
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "cockroachdb": "cockroachdb+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_url(database_url: str):
+    """Map DATABASE_URL (sync driver) to the matching async driver URL."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if url.get_driver_name() in ("asyncpg", "aiomysql", "aiosqlite"):
+        return url
+    url = url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+    if url.drivername.endswith("+asyncpg") and "sslmode" in url.query:
+        # asyncpg spells libpq's sslmode as ssl
+        query = dict(url.query)
+        query["ssl"] = query.pop("sslmode")
+        url = url.set(query=query)
+    return url
+
+
 def get_server_url(database_url: str):
     return re.sub(r"/[a-zA-Z0-9_]+(\?|$)", "/", database_url, count=1)
 
@@ -39,18 +64,72 @@ if DATABASE_URL and DATABASE_URL.startswith("cockroachdb://"):
     from sqlalchemy_cockroachdb import run_transaction
 
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True
-)
+def get_connect_args(url, statement_timeout_ms: int = 0):
+    """Driver arguments that apply the statement timeout on every new connection."""
+    if not statement_timeout_ms:
+        return {}
+    backend, driver = url.get_backend_name(), url.get_driver_name()
+    if backend in ("postgresql", "cockroachdb"):
+        if driver == "asyncpg":
+            return {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+        return {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    if backend == "mysql":
+        return {"init_command": f"SET SESSION max_execution_time={statement_timeout_ms}"}
+    return {}
+
+
+def get_engine_options(url, poolclass):
+    options = {
+        "echo": settings.SQL_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": get_connect_args(url, settings.DB_STATEMENT_TIMEOUT_MS),
+    }
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite must stay on its single shared connection
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+sync_url = make_url(DATABASE_URL)
+engine = create_engine(sync_url, **get_engine_options(sync_url, MeteredQueuePool))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+# Request handlers use the async engine; the sync one above is kept for
+# startup (create_all) and scripts.
+async_url = get_async_url(DATABASE_URL)
+async_engine = create_async_engine(async_url, **get_engine_options(async_url, MeteredAsyncQueuePool))
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Checkout-wait metrics, served at GET /admin/db/pool
+pool_metrics = {"async": PoolMetrics(), "sync": PoolMetrics()}
+async_engine.pool.metrics = pool_metrics["async"]
+engine.pool.metrics = pool_metrics["sync"]
+
+
+def get_pool_stats():
+    stats = {}
+    for name, pool in (("async", async_engine.pool), ("sync", engine.pool)):
+        metrics = getattr(pool, "metrics", None)
+        stats[name] = metrics.snapshot(pool) if metrics is not None else {"pool": pool.status()}
+    stats["settings"] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+        "echo": settings.SQL_ECHO,
+    }
+    return stats
+
+
+Base = declarative_base()
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class PoolMetrics:
+    """Checkout wait times for a connection pool, for sizing it under load."""
+
+    def __init__(self, window: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._recent.append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = self.timeouts = 0
+            self.total_wait = self.max_wait = 0.0
+            self._recent.clear()
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            recent = list(self._recent)
+            attempts = self.checkouts + self.timeouts
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "p95_wait_ms": round(_percentile(recent, 95) * 1000, 3),
+                "p99_wait_ms": round(_percentile(recent, 99) * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+        if pool is not None:
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "idle": pool.checkedin(),
+            })
+        return data
+
+
+class _MeteredMixin:
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        # Time spent here is time a request waited for a connection
+        # (including opening a new one when the pool can grow).
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(_MeteredMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredMixin, AsyncAdaptedQueuePool):
+    pass
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Index, Integer, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.connection import Base
 
 class Credit(Base):
     __tablename__ = "credits"
+    __table_args__ = (
+        Index("ix_credits_user_id_timestamp", "user_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
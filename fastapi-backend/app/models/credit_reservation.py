@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Index, Integer, ForeignKey, String, DateTime
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database.connection import Base
+
+class CreditReservation(Base):
+    __tablename__ = "credit_reservations"
+    __table_args__ = (
+        # expiry sweep: held reservations of one user
+        Index("ix_credit_reservations_user_id_status", "user_id", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    amount = Column(Integer, nullable=False)  # credits held
+    settled_amount = Column(Integer, nullable=True)  # credits finally charged
+    status = Column(String(20), default="held")  # held, settled, released, expired
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    
+    user = relationship("User", backref="credit_reservations")
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, String, DateTime
+from sqlalchemy import Column, Index, Integer, Float, ForeignKey, String, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.connection import Base
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_payments_status", "status"),
+        # Admin payments listing: keyset pages by (timestamp, id)
+        Index("ix_payments_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, DateTime
+from sqlalchemy import Column, Index, Integer, ForeignKey, String, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.connection import Base
 
 class ResponseLog(Base):
     __tablename__ = "response_logs"
+    __table_args__ = (
+        # per-user history, newest first
+        Index("ix_response_logs_user_id_timestamp", "user_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
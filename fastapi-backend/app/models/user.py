@@ -1,9 +1,13 @@
 from app.database.connection import Base
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Index, Integer, String, Boolean
 from sqlalchemy.orm import relationship
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin users listing sorted by credits: keyset pages by (credits, id)
+        Index("ix_users_credits_id", "credits", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True)
@@ -1,58 +1,75 @@
 import logging
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
-from app.database.connection import get_db
-from app.core.dependencies import get_current_admin
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from app.core.dependencies import get_db, get_current_admin
+from app.database.connection import get_pool_stats
+from app.core.identity_cache import Identity, invalidate_user
 from app.models.user import User
 from app.models.payment import Payment
+from app.crud import admin_crud, credit_crud
+from app.crud.dashboard_aggregates import dashboard_aggregates
+from app.crud.pagination import DEFAULT_PAGE_SIZE, InvalidCursor
+from app.schemas.admin import UserPage, PaymentPage
 
 
 
 router = APIRouter()
 
 
+def _check_sort(sort: str, order: str, allowed: dict):
+    if sort not in allowed:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(allowed)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
 
-#  List all users
-@router.get("/users", summary="List all users (Admin only)")
-def list_users(db: Session = Depends(get_db), admin: User = Depends(get_current_admin)):
-    users = db.query(User).all()
-    # Return user data with usernames as identifiers
-    return [
-        {
-            'username': user.username,
-            'email': user.email,
-            'is_active': user.is_active,
-            'is_admin': user.is_admin,
-            'credits': user.credits
-        }
-        for user in users
-    ]
+
+
+#  List users (keyset paginated)
+@router.get("/users", response_model=UserPage, summary="List users, one page at a time (Admin only)")
+async def list_users(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    order: str = "desc",
+    is_active: Optional[bool] = None,
+    is_admin: Optional[bool] = None,
+    username: Optional[str] = Query(None, description="Username prefix"),
+    db: AsyncSession = Depends(get_db),
+    admin: Identity = Depends(get_current_admin)
+):
+    _check_sort(sort, order, admin_crud.USER_SORTS)
+    try:
+        return await admin_crud.list_users_page(
+            db, limit, cursor, sort, order, is_active=is_active, is_admin=is_admin, username_prefix=username
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 #  Delete user
 @router.delete("/users/{username}", summary="Delete a user by username (Admin only)")
 async def delete_user(
     request: Request,
     username: str, 
-    db: Session = Depends(get_db), 
-    admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db), 
+    admin: Identity = Depends(get_current_admin)
 ):
     
     
     # Find user by username
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
     
     if not user:
         error_msg = f"User with username '{username}' not found in database"
         
-        all_usernames = [u.username for u in db.query(User).all()]
-        
         raise HTTPException(status_code=404, detail=error_msg)
     
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    invalidate_user(username)
     
     return {"msg": f"User {user.username} deleted"}
 
@@ -62,25 +79,23 @@ async def grant_credits(
     request: Request,
     username: str, 
     amount: int, 
-    db: Session = Depends(get_db), 
-    admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db), 
+    admin: Identity = Depends(get_current_admin)
 ):
     
     
     # Find user by username
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
     
     if not user:
         error_msg = f"User with username '{username}' not found in database"
         
-        all_usernames = [u.username for u in db.query(User).all()]
-        
         raise HTTPException(status_code=404, detail=error_msg)
     
     
-    user.credits += amount
-    db.commit()
-    db.refresh(user)
+    await credit_crud.change_credits(db, user, amount)
+    await db.commit()
+    invalidate_user(username)
     
     return {"msg": f"Granted {amount} credits to {user.username}", "new_balance": user.credits}
 
@@ -90,13 +105,13 @@ async def deduct_credits(
     request: Request,
     username: str, 
     amount: int, 
-    db: Session = Depends(get_db), 
-    admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db), 
+    admin: Identity = Depends(get_current_admin)
 ):
 
     
     # Find user by username
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
     
     if not user:
         error_msg = f"User with username '{username}' not found in database"
@@ -106,36 +121,50 @@ async def deduct_credits(
         raise HTTPException(status_code=404, detail=error_msg)
     
     
-    if user.credits < amount:
+    # Conditional UPDATE: two concurrent deducts cannot both pass the check
+    if await credit_crud.deduct_credits(db, user, amount) is None:
         error_msg = f"Not enough credits. Current: {user.credits}, Requested: {amount}"
         
         raise HTTPException(status_code=400, detail=error_msg)
     
-    
-    user.credits -= amount
-    db.commit()
-    db.refresh(user)
+    invalidate_user(username)
         
     return {"msg": f"Deducted {amount} credits from {user.username}", "new_balance": user.credits}
 
 #  Payment Management
 
-#  View all payments
-@router.get("/payments", summary="View all payments (Admin only)")
-def view_all_payments(db: Session = Depends(get_db), admin: User = Depends(get_current_admin)):
-    return db.query(Payment).all()
+#  View payments (keyset paginated)
+@router.get("/payments", response_model=PaymentPage, summary="View payments, one page at a time (Admin only)")
+async def view_all_payments(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "timestamp",
+    order: str = "desc",
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    username: Optional[str] = Query(None, description="Username prefix"),
+    db: AsyncSession = Depends(get_db),
+    admin: Identity = Depends(get_current_admin)
+):
+    _check_sort(sort, order, admin_crud.PAYMENT_SORTS)
+    try:
+        return await admin_crud.list_payments_page(
+            db, limit, cursor, sort, order, status=status, user_id=user_id, username_prefix=username
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 #  View payments by user
 @router.get("/users/{username}/payments", summary="View payments of a specific user (Admin only)")
-def view_user_payments(
+async def view_user_payments(
     username: str,
-    db: Session = Depends(get_db), 
-    admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db), 
+    admin: Identity = Depends(get_current_admin)
 ):
     
     
     # Find user by username
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
     
     if not user:
         error_msg = f"User with username '{username}' not found in database"
@@ -143,29 +172,22 @@ def view_user_payments(
         
         raise HTTPException(status_code=404, detail=error_msg)
     
-    payments = db.query(Payment).filter(Payment.user_id == user.id).all()
+    payments = (await db.execute(select(Payment).where(Payment.user_id == user.id))).scalars().all()
     
     return payments
 
 #  Dashboard Summary
 
 @router.get("/dashboard", summary="Admin Dashboard Summary (Admin only)")
-def admin_dashboard(db: Session = Depends(get_db), admin: User = Depends(get_current_admin)):
-    # Total users
-    total_users = db.query(func.count(User.id)).scalar()
-
-    # Total credits across all users
-    total_credits = db.query(func.sum(User.credits)).scalar() or 0
-
-    # Total revenue
-    total_revenue = db.query(func.sum(Payment.amount)).scalar() or 0.0
-
-    # Total number of payments
-    total_payments = db.query(func.count(Payment.id)).scalar()
-
-    return {
-        "total_users": total_users,
-        "total_credits": total_credits,
-        "total_revenue": total_revenue,
-        "total_payments": total_payments,
-    }
+async def admin_dashboard(db: AsyncSession = Depends(get_db), admin: Identity = Depends(get_current_admin)):
+    # Served from in-memory aggregates kept current on every commit
+    return await dashboard_aggregates.snapshot(db)
+
+@router.get("/dashboard/series", summary="Daily revenue, credits spent and active users (Admin only)")
+async def admin_dashboard_series(days: int = 30, db: AsyncSession = Depends(get_db), admin: Identity = Depends(get_current_admin)):
+    return await dashboard_aggregates.series(db, days)
+
+#  Database pool metrics
+@router.get("/db/pool", summary="Connection pool checkout-wait metrics (Admin only)")
+async def db_pool_metrics(admin: Identity = Depends(get_current_admin)):
+    return get_pool_stats()
@@ -1,14 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.schemas.response_log import ResponseCreate, ResponseOut
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.response_log import ResponseCreate, ResponseOut, ResponseCharge, ResponseChargeOut
 from app.crud import response_crud
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_current_identity
+from app.crud.credit_crud import current_balance
 
 router = APIRouter()
 
 @router.post("/", response_model=ResponseOut)
-def log_ai_response(response: ResponseCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    log = response_crud.create_response(db, current_user, response.query, response.ai_response, response.tokens_used)
+async def log_ai_response(response: ResponseCreate, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    return await response_crud.create_response(db, current_user, response.query, response.ai_response, response.tokens_used)
+
+@router.post("/charge", response_model=ResponseChargeOut)
+async def charge_ai_response(response: ResponseCharge, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    log, charged = await response_crud.charge_and_log(
+        db, current_user, response.query, response.ai_response, response.tokens_used, response.reservation_id
+    )
     if log is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient credits")
-    return log
+    return {
+        "id": log.id,
+        "tokens_used": log.tokens_used,
+        "charged": charged,
+        "balance": await current_balance(db, current_user),
+        "timestamp": log.timestamp,
+    }
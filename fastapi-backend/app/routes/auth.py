@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from app.schemas.user import UserCreate, Token, UserOut
 from app.crud import user_crud
@@ -9,18 +9,18 @@ from app.core.dependencies import get_db, get_current_user
 router = APIRouter()
 
 @router.post("/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = user_crud.create_user(db, user)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await user_crud.create_user(db, user)
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = user_crud.authenticate_user(db, form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await user_crud.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     access_token = create_access_token(subject=user.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserOut)
-def read_users_me(current_user=Depends(get_current_user)):
+async def read_users_me(current_user=Depends(get_current_user)):
     return current_user
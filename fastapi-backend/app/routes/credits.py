@@ -1,22 +1,59 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.dependencies import get_db, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_db, get_current_identity
 from app.crud import credit_crud
-from app.schemas.credit import CreditCreate, CreditOut
+from app.schemas.credit import CreditCreate, CreditOut, ReservationCreate, ReservationSettle, ReservationOut
 
 router = APIRouter()
 
 @router.post("/add", response_model=CreditOut)
-def add_credits(credit: CreditCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    return credit_crud.add_credits(db, current_user, credit.amount)
+async def add_credits(credit: CreditCreate, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    return await credit_crud.add_credits(db, current_user, credit.amount)
 
 @router.post("/deduct", response_model=CreditOut)
-def deduct_credits(credit: CreditCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    result = credit_crud.deduct_credits(db, current_user, credit.amount)
+async def deduct_credits(credit: CreditCreate, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    result = await credit_crud.deduct_credits(db, current_user, credit.amount)
     if not result:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient credits")
     return result
 
 @router.get("/balance")
-def get_balance(current_user=Depends(get_current_user)):
-    return {"credits": current_user.credits}
+async def get_balance(db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    return {"credits": await credit_crud.get_balance(db, current_user.id)}
+
+async def _reservation_out(db, reservation, user):
+    return {
+        "id": reservation.id,
+        "amount": reservation.amount,
+        "settled_amount": reservation.settled_amount,
+        "status": reservation.status,
+        "expires_at": reservation.expires_at,
+        "balance": await credit_crud.current_balance(db, user),
+    }
+
+@router.post("/reserve", response_model=ReservationOut)
+async def reserve_credits(reservation: ReservationCreate, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    result = await credit_crud.reserve_credits(db, current_user, reservation.amount)
+    if not result:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient credits")
+    return await _reservation_out(db, result, current_user)
+
+@router.post("/reservations/{reservation_id}/settle", response_model=ReservationOut)
+async def settle_reservation(reservation_id: int, settle: ReservationSettle, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    reservation = await credit_crud.get_held_reservation(db, current_user, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found or already closed")
+    result = await credit_crud.settle_reservation(db, current_user, reservation, settle.amount)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found or already closed")
+    return await _reservation_out(db, result, current_user)
+
+@router.post("/reservations/{reservation_id}/release", response_model=ReservationOut)
+async def release_reservation(reservation_id: int, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    reservation = await credit_crud.get_held_reservation(db, current_user, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found or already closed")
+    result = await credit_crud.release_reservation(db, current_user, reservation)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found or already closed")
+    return await _reservation_out(db, result, current_user)
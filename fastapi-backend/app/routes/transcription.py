@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.schemas.transcription_log import TranscriptionCreate, TranscriptionOut
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.transcription_log import TranscriptionCreate, TranscriptionOut, TranscriptionBatchCreate, TranscriptionBatchOut
 from app.crud import transcription_crud
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_current_identity
 
 router = APIRouter()
 
+# Upper bound on transcripts accepted per batch request
+MAX_BATCH_SIZE = 500
+
 @router.post("/", response_model=TranscriptionOut)
-def log_transcription(transcription: TranscriptionCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    return transcription_crud.create_transcription(db, current_user.id, transcription.transcript_text)
+async def log_transcription(transcription: TranscriptionCreate, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    return await transcription_crud.create_transcription(db, current_user.id, transcription.transcript_text)
+
+@router.post("/batch", response_model=TranscriptionBatchOut)
+async def log_transcriptions(batch: TranscriptionBatchCreate, db: AsyncSession = Depends(get_db), current_user=Depends(get_current_identity)):
+    if len(batch.transcripts) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_BATCH_SIZE} transcripts per batch")
+    ids = await transcription_crud.create_transcriptions(db, current_user.id, [t.transcript_text for t in batch.transcripts])
+    return {"ids": ids, "count": len(ids)}
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional, Union
+
+class UserSummary(BaseModel):
+    id: int
+    username: str
+    email: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_admin: Optional[bool] = None
+    credits: Optional[int] = None
+
+class PaymentSummary(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    email: Optional[str] = None
+    amount: Union[int, float]
+    status: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+class UserPage(BaseModel):
+    items: List[UserSummary]
+    next_cursor: Optional[str] = None
+    limit: int
+
+class PaymentPage(BaseModel):
+    items: List[PaymentSummary]
+    next_cursor: Optional[str] = None
+    limit: int
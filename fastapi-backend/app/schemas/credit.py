@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, conint
 from datetime import datetime
+from typing import Optional
 
 class CreditCreate(BaseModel):
     amount: int
@@ -12,3 +13,17 @@ class CreditOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+class ReservationCreate(BaseModel):
+    amount: conint(gt=0)
+
+class ReservationSettle(BaseModel):
+    amount: conint(ge=0)
+
+class ReservationOut(BaseModel):
+    id: int
+    amount: int
+    settled_amount: Optional[int] = None
+    status: str
+    expires_at: datetime
+    balance: int
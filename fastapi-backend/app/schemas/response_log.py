@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 
 class ResponseCreate(BaseModel):
     query: str
@@ -16,3 +17,15 @@ class ResponseOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+class ResponseCharge(ResponseCreate):
+    tokens_used: int = Field(..., ge=0)
+    # Settle this held reservation instead of deducting from the balance
+    reservation_id: Optional[int] = None
+
+class ResponseChargeOut(BaseModel):
+    id: int
+    tokens_used: int
+    charged: int
+    balance: int
+    timestamp: datetime
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List
 
 class TranscriptionCreate(BaseModel):
     transcript_text: str
@@ -12,3 +13,10 @@ class TranscriptionOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+class TranscriptionBatchCreate(BaseModel):
+    transcripts: List[TranscriptionCreate]
+
+class TranscriptionBatchOut(BaseModel):
+    ids: List[int]
+    count: int
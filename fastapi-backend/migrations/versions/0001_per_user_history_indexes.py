@@ -0,0 +1,51 @@
+"""per-user history indexes
+
+Adds (user_id, timestamp) indexes to the log and ledger tables and a status
+index on payments. Tables themselves are still created by create_all at
+startup, which also creates these indexes on fresh databases, so existing
+indexes are skipped.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_response_logs_user_id_timestamp", "response_logs", ["user_id", "timestamp"]),
+    ("ix_transcription_logs_user_id_timestamp", "transcription_logs", ["user_id", "timestamp"]),
+    ("ix_credits_user_id_timestamp", "credits", ["user_id", "timestamp"]),
+    ("ix_payments_user_id_timestamp", "payments", ["user_id", "timestamp"]),
+    ("ix_payments_status", "payments", ["status"]),
+    ("ix_credit_reservations_user_id_status", "credit_reservations", ["user_id", "status"]),
+]
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        existing = _existing_indexes(table)
+        if existing is not None and name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        existing = _existing_indexes(table)
+        if existing and name in existing:
+            op.drop_index(name, table_name=table)
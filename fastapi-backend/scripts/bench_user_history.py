@@ -0,0 +1,103 @@
+"""
+Benchmark per-user history queries on a large response_logs table.
+
+Seeds ROWS response logs spread over USERS users, then times the query behind
+a user's history page (latest 50 rows for one user) with and without the
+(user_id, timestamp) index. Runs against DATABASE_URL, or a throwaway SQLite
+file when it is not set:
+
+    python scripts/bench_user_history.py --rows 1000000 --users 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_history.db")
+
+from sqlalchemy import bindparam, delete, func, insert, select  # noqa: E402
+from app.database.connection import Base, engine  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.response_log import ResponseLog  # noqa: E402
+
+INDEX_NAME = "ix_response_logs_user_id_timestamp"
+table = ResponseLog.__table__
+
+
+def seed(conn, rows, users, batch=20000):
+    existing = conn.execute(select(func.count()).select_from(table)).scalar()
+    if existing >= rows:
+        print(f"reusing {existing:,} existing rows")
+        return
+    conn.execute(delete(table))
+    start = datetime.utcnow() - timedelta(days=365)
+    t0 = time.perf_counter()
+    for offset in range(0, rows, batch):
+        conn.execute(insert(table), [
+            {
+                "user_id": random.randint(1, users),
+                "query": "q",
+                "ai_response": "a",
+                "tokens_used": 1,
+                "timestamp": start + timedelta(seconds=offset + i),
+            }
+            for i in range(min(batch, rows - offset))
+        ])
+    conn.commit()
+    print(f"seeded {rows:,} rows for {users:,} users in {time.perf_counter() - t0:.1f}s")
+
+
+def time_history(conn, users, runs, limit=50):
+    stmt = (
+        select(table.c.id, table.c.query, table.c.tokens_used, table.c.timestamp)
+        .where(table.c.user_id == bindparam("user_id"))
+        .order_by(table.c.timestamp.desc())
+        .limit(limit)
+    )
+    samples = []
+    for _ in range(runs):
+        user_id = random.randint(1, users)
+        t0 = time.perf_counter()
+        conn.execute(stmt, {"user_id": user_id}).fetchall()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "max_ms": samples[-1],
+    }
+
+
+def set_index(conn, present):
+    index = next(i for i in table.indexes if i.name == INDEX_NAME)
+    index.drop(conn, checkfirst=True)
+    if present:
+        index.create(conn)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--skip-unindexed", action="store_true", help="only time the indexed query")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine, tables=[User.__table__, table])
+    with engine.connect() as conn:
+        seed(conn, args.rows, args.users)
+        modes = [True] if args.skip_unindexed else [False, True]
+        for present in modes:
+            set_index(conn, present)
+            result = time_history(conn, args.users, args.runs if present else max(10, args.runs // 20))
+            label = "with index   " if present else "without index"
+            print(f"{label}  p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms  max {result['max_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Concurrency check for credit deductions.
+
+Registers a user with START credits, then fires REQUESTS deductions of AMOUNT
+at the same time, split between POST /credits/deduct and the admin
+POST /admin/users/{username}/deduct_credits route. Fails if the balance ever
+goes negative, if more deductions succeed than the balance covers, or if the
+balance and the credit ledger disagree. Runs in-process against DATABASE_URL,
+or a throwaway SQLite file when it is not set:
+
+    python scripts/stress_deduct.py --requests 500 --start 100 --amount 1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///stress_deduct.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database.connection import SessionLocal  # noqa: E402
+from app.models.credit import Credit  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def register(client, username, credits, is_admin=False):
+    payload = {"username": username, "email": f"{username}@example.com", "password": "stress",
+               "credits": credits, "is_admin": is_admin}
+    r = await client.post("/auth/register", json=payload)
+    r.raise_for_status()
+    r = await client.post("/auth/login", data={"username": username, "password": "stress"})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def run(requests, start, amount):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+        suffix = uuid.uuid4().hex[:8]
+        username = f"stress_{suffix}"
+        user_headers = await register(client, username, start)
+        admin_headers = await register(client, f"stress_admin_{suffix}", 0, is_admin=True)
+
+        async def deduct(i):
+            if i % 2:
+                r = await client.post(f"/admin/users/{username}/deduct_credits",
+                                      params={"amount": amount}, headers=admin_headers)
+            else:
+                r = await client.post("/credits/deduct", json={"amount": amount}, headers=user_headers)
+            return r.status_code
+
+        t0 = time.perf_counter()
+        statuses = await asyncio.gather(*(deduct(i) for i in range(requests)))
+        elapsed = time.perf_counter() - t0
+
+    with SessionLocal() as db:
+        user = db.execute(select(User).where(User.username == username)).scalar_one()
+        ledger = db.execute(
+            select(func.coalesce(func.sum(-Credit.amount), 0)).where(Credit.user_id == user.id, Credit.amount < 0)
+        ).scalar()
+        balance = user.credits
+
+    ok = statuses.count(200)
+    refused = statuses.count(400)
+    errors = len(statuses) - ok - refused
+    print(f"{requests} deducts of {amount} in {elapsed:.2f}s: {ok} ok, {refused} refused, {errors} errors")
+    print(f"start {start}, final balance {balance}, ledger debits {ledger}")
+
+    failures = []
+    if balance < 0:
+        failures.append("balance went negative")
+    if ok * amount > start:
+        failures.append("more deductions succeeded than the balance covers")
+    if balance != start - ok * amount:
+        failures.append("balance does not match the successful deductions")
+    if ledger != ok * amount:
+        failures.append("credit ledger does not match the successful deductions")
+    if errors == 0 and ok != min(requests, start // amount):
+        failures.append("deductions were refused while credits were available")
+    for failure in failures:
+        print("FAIL:", failure)
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--start", type=int, default=100)
+    parser.add_argument("--amount", type=int, default=1)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.requests, args.start, args.amount))
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# app.database.connection builds its engines at import time from DATABASE_URL
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
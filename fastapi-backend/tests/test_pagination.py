@@ -0,0 +1,122 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.crud import admin_crud
+from app.crud.pagination import InvalidCursor, decode_cursor
+from app.database.connection import Base
+from app.models import credit, credit_reservation, response_log, transcription_log  # noqa: F401
+from app.models.payment import Payment
+from app.models.user import User
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "pages.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    yield engine, create_async_engine(f"sqlite+aiosqlite:///{path}")
+    engine.dispose()
+
+
+def seed(engine, credits, payments):
+    from sqlalchemy.orm import Session
+    with Session(engine) as db:
+        users = [User(username=f"user{i}", email=f"user{i}@example.com", credits=c) for i, c in enumerate(credits)]
+        db.add_all(users)
+        db.flush()
+        # The column default replaces None on insert
+        db.execute(update(User).where(User.id.in_([u.id for u, c in zip(users, credits) if c is None]))
+                   .values(credits=None))
+        start = datetime(2026, 1, 1)
+        for i, minutes in enumerate(payments):
+            timestamp = None if minutes is None else start + timedelta(minutes=minutes)
+            db.add(Payment(user_id=users[i % len(users)].id, amount=i + 1, status="completed", timestamp=timestamp))
+        db.commit()
+
+
+def walk(async_engine, list_page, limit, **kwargs):
+    """Follow next_cursor to the end; returns the rows and the SQL that was run."""
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, parameters, context, many: statements.append((statement, parameters)))
+
+    async def run():
+        rows, cursor = [], None
+        async with AsyncSession(async_engine) as db:
+            while True:
+                page = await list_page(db, limit, cursor=cursor, **kwargs)
+                rows += page["items"]
+                cursor = page["next_cursor"]
+                if not cursor:
+                    return rows
+    rows = asyncio.run(run())
+    asyncio.run(async_engine.dispose())
+    return rows, statements
+
+
+def query_plans(engine, statements):
+    with engine.connect() as conn:
+        return [
+            " | ".join(row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+            for statement, parameters in statements if statement.lstrip().upper().startswith("SELECT")
+        ]
+
+
+def test_payment_pages_use_the_timestamp_index(database):
+    engine, async_engine = database
+    seed(engine, [10, 20], list(range(40)) + [None] * 5)
+    rows, statements = walk(async_engine, admin_crud.list_payments_page, 7, sort="timestamp", order="desc")
+
+    assert len(rows) == 45 and len({row["id"] for row in rows}) == 45
+    # Pages over the non-NULL timestamps: an index range scan, no sort step
+    value_queries = [s for s in statements if "payments.timestamp IS NOT NULL" in s[0]]
+    assert len(value_queries) == 7
+    for plan in query_plans(engine, value_queries):
+        assert "ix_payments_timestamp_id" in plan, plan
+        assert "TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_null_sort_values_come_last_and_are_not_skipped(database, order):
+    engine, async_engine = database
+    credits = [5, None, 3, None, 5, 0, None, 8]
+    seed(engine, credits, [])
+    rows, _ = walk(async_engine, admin_crud.list_users_page, 2, sort="credits", order=order)
+
+    assert sorted(row["username"] for row in rows) == sorted(f"user{i}" for i in range(len(credits)))
+    values = [row["credits"] for row in rows]
+    assert values[-3:] == [None, None, None]
+    assert values[:-3] == sorted(values[:-3], reverse=order == "desc")
+
+
+def _cursor(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!!",
+    _cursor(b'[1,"abc"]'),
+    _cursor(b'[{"dt":"yesterday"},1]'),
+    _cursor(b'[{"x":1},1]'),
+    _cursor(b'[[1],1]'),
+    _cursor(b'[1]'),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_null_cursor_on_non_nullable_sort_is_rejected(database):
+    _, async_engine = database
+
+    async def run():
+        async with AsyncSession(async_engine) as db:
+            await admin_crud.list_users_page(db, 2, cursor=_cursor(b"[null,3]"), sort="id")
+    with pytest.raises(InvalidCursor):
+        asyncio.run(run())
+    asyncio.run(async_engine.dispose())
@@ -10,6 +10,7 @@ const AdminDashboard = () => {
   const [users, setUsers] = useState([]);
   const [payments, setPayments] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [refreshKey, setRefreshKey] = useState(0);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
   
@@ -34,13 +35,13 @@ const AdminDashboard = () => {
     try {
       const [dashboardResponse, usersResponse, paymentsResponse] = await Promise.all([
         adminAPI.getDashboard(),
-        adminAPI.getUsers(),
-        adminAPI.getAllPayments(),
+        adminAPI.getUsers({ limit: 5, sort: 'id', order: 'desc' }),
+        adminAPI.getAllPayments({ limit: 5, sort: 'timestamp', order: 'desc' }),
       ]);
 
       setDashboardData(dashboardResponse.data);
-      setUsers(usersResponse.data);
-      setPayments(paymentsResponse.data);
+      setUsers(usersResponse.data.items);
+      setPayments(paymentsResponse.data.items);
     } catch (error) {
       setError('Failed to load admin data');
       console.error('Admin data loading error:', error);
@@ -66,6 +67,7 @@ const AdminDashboard = () => {
         default:
           break;
       }
+      setRefreshKey(key => key + 1);
       await loadAdminData();
     } catch (error) {
       setError(error.response?.data?.detail || `Failed to ${action}`);
@@ -121,16 +123,13 @@ const AdminDashboard = () => {
 
           {activeTab === 'users' && (
             <UserManagement 
-              users={users}
+              refreshKey={refreshKey}
               onUserAction={handleUserAction}
             />
           )}
 
           {activeTab === 'payments' && (
-            <PaymentManagement 
-              payments={payments}
-              users={users}
-            />
+            <PaymentManagement />
           )}
         </div>
       </div>
@@ -8,28 +8,25 @@ const AdminStats = ({ data, users, payments }) => {
     }).format(amount);
   };
 
+  // users/payments are the first (newest) page from the API; totals come from the dashboard summary
   const getRecentUsers = () => {
-    return users
-      .sort((a, b) => new Date(b.id) - new Date(a.id))
-      .slice(0, 5);
+    return users.slice(0, 5);
   };
 
   const getRecentPayments = () => {
-    return payments
-      .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp))
-      .slice(0, 5);
+    return payments.slice(0, 5);
   };
 
   const getTotalRevenue = () => {
-    return payments.reduce((sum, payment) => sum + payment.amount, 0);
+    return data?.total_revenue || 0;
   };
 
   const getActiveUsers = () => {
-    return users.filter(user => user.is_active).length;
+    return data?.active_users || 0;
   };
 
   const getAdminUsers = () => {
-    return users.filter(user => user.is_admin).length;
+    return data?.admin_users || 0;
   };
 
   return (
@@ -58,7 +55,7 @@ const AdminStats = ({ data, users, payments }) => {
         <div className="stat-card info">
           <div className="stat-icon">💰</div>
           <div className="stat-content">
-            <div className="stat-value">{formatCurrency(data?.total_revenue || getTotalRevenue())}</div>
+            <div className="stat-value">{formatCurrency(getTotalRevenue())}</div>
             <div className="stat-label">Total Revenue</div>
             <div className="stat-detail">{data?.total_payments || payments.length} payments</div>
           </div>
@@ -67,7 +64,7 @@ const AdminStats = ({ data, users, payments }) => {
         <div className="stat-card warning">
           <div className="stat-icon">📈</div>
           <div className="stat-content">
-            <div className="stat-value">{formatCurrency(getTotalRevenue() / (payments.length || 1))}</div>
+            <div className="stat-value">{formatCurrency(getTotalRevenue() / (data?.total_payments || 1))}</div>
             <div className="stat-label">Avg Payment</div>
             <div className="stat-detail">Per transaction</div>
           </div>
@@ -111,7 +108,7 @@ const AdminStats = ({ data, users, payments }) => {
                 <div className="recent-info">
                   <div className="recent-name">{formatCurrency(payment.amount)}</div>
                   <div className="recent-detail">
-                    User ID: {payment.user_id}
+                    {payment.username || `User ID: ${payment.user_id}`}
                   </div>
                 </div>
                 <div className="recent-status">
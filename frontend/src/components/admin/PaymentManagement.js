@@ -1,39 +1,43 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
+import { adminAPI } from '../../services/api';
 
-const PaymentManagement = ({ payments, users }) => {
+const PAGE_SIZE = 50;
+
+const PaymentManagement = () => {
+  const [payments, setPayments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingPage, setLoadingPage] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [sortBy, setSortBy] = useState('timestamp');
   const [sortOrder, setSortOrder] = useState('desc');
   const [statusFilter, setStatusFilter] = useState('all');
 
-  const getUserById = (userId) => {
-    return users.find(user => user.id === userId);
-  };
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // Filtering and sorting happen on the server; pages are fetched by cursor
+  const loadPage = useCallback(async (cursor = null) => {
+    setLoadingPage(true);
+    try {
+      const params = { limit: PAGE_SIZE, sort: sortBy, order: sortOrder };
+      if (debouncedSearch) params.username = debouncedSearch;
+      if (statusFilter !== 'all') params.status = statusFilter;
+      if (cursor) params.cursor = cursor;
+      const response = await adminAPI.getAllPayments(params);
+      setPayments(prev => (cursor ? [...prev, ...response.data.items] : response.data.items));
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Payment page loading error:', error);
+    }
+    setLoadingPage(false);
+  }, [sortBy, sortOrder, debouncedSearch, statusFilter]);
 
-  const filteredPayments = payments
-    .filter(payment => {
-      const user = getUserById(payment.user_id);
-      const matchesSearch = user?.username.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                           user?.email.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                           payment.id.toString().includes(searchTerm);
-      const matchesStatus = statusFilter === 'all' || payment.status === statusFilter;
-      return matchesSearch && matchesStatus;
-    })
-    .sort((a, b) => {
-      let aVal = a[sortBy];
-      let bVal = b[sortBy];
-      
-      if (sortBy === 'timestamp') {
-        aVal = new Date(aVal);
-        bVal = new Date(bVal);
-      }
-      
-      if (sortOrder === 'asc') {
-        return aVal > bVal ? 1 : -1;
-      } else {
-        return aVal < bVal ? 1 : -1;
-      }
-    });
+  useEffect(() => {
+    loadPage();
+  }, [loadPage]);
 
   const handleSort = (field) => {
     if (sortBy === field) {
@@ -61,11 +65,11 @@ const PaymentManagement = ({ payments, users }) => {
   };
 
   const getTotalRevenue = () => {
-    return filteredPayments.reduce((sum, payment) => sum + payment.amount, 0);
+    return payments.reduce((sum, payment) => sum + payment.amount, 0);
   };
 
   const getStatusStats = () => {
-    const stats = filteredPayments.reduce((acc, payment) => {
+    const stats = payments.reduce((acc, payment) => {
       acc[payment.status] = (acc[payment.status] || 0) + 1;
       return acc;
     }, {});
@@ -81,12 +85,12 @@ const PaymentManagement = ({ payments, users }) => {
           <h2>Payment Management</h2>
           <div className="payment-stats">
             <div className="stat-item">
-              <span className="stat-label">Total Revenue:</span>
+              <span className="stat-label">Revenue (shown):</span>
               <span className="stat-value">{formatCurrency(getTotalRevenue())}</span>
             </div>
             <div className="stat-item">
-              <span className="stat-label">Total Payments:</span>
-              <span className="stat-value">{filteredPayments.length}</span>
+              <span className="stat-label">Payments shown:</span>
+              <span className="stat-value">{payments.length}</span>
             </div>
           </div>
         </div>
@@ -95,7 +99,7 @@ const PaymentManagement = ({ payments, users }) => {
           <div className="search-box">
             <input
               type="text"
-              placeholder="Search payments..."
+              placeholder="Search by username..."
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
             />
@@ -132,23 +136,18 @@ const PaymentManagement = ({ payments, users }) => {
               <th onClick={() => handleSort('id')} className="sortable">
                 Payment ID {getSortIcon('id')}
               </th>
-              <th onClick={() => handleSort('user_id')} className="sortable">
-                User {getSortIcon('user_id')}
-              </th>
+              <th>User</th>
               <th onClick={() => handleSort('amount')} className="sortable">
                 Amount {getSortIcon('amount')}
               </th>
-              <th onClick={() => handleSort('status')} className="sortable">
-                Status {getSortIcon('status')}
-              </th>
+              <th>Status</th>
               <th onClick={() => handleSort('timestamp')} className="sortable">
                 Date {getSortIcon('timestamp')}
               </th>
             </tr>
           </thead>
           <tbody>
-            {filteredPayments.map(payment => {
-              const user = getUserById(payment.user_id);
+            {payments.map(payment => {
               return (
                 <tr key={payment.id}>
                   <td>
@@ -156,14 +155,14 @@ const PaymentManagement = ({ payments, users }) => {
                   </td>
                   <td>
                     <div className="user-info">
-                      {user ? (
+                      {payment.username ? (
                         <>
                           <div className="user-avatar">
-                            {user.username[0].toUpperCase()}
+                            {payment.username[0].toUpperCase()}
                           </div>
                           <div className="user-details">
-                            <div className="username">{user.username}</div>
-                            <div className="user-email">{user.email}</div>
+                            <div className="username">{payment.username}</div>
+                            <div className="user-email">{payment.email}</div>
                           </div>
                         </>
                       ) : (
@@ -190,12 +189,24 @@ const PaymentManagement = ({ payments, users }) => {
           </tbody>
         </table>
 
-        {filteredPayments.length === 0 && (
+        {payments.length === 0 && !loadingPage && (
           <div className="empty-state">
             <div className="empty-icon">💳</div>
             <p>No payments found matching your criteria</p>
           </div>
         )}
+
+        {nextCursor && (
+          <div className="load-more">
+            <button
+              className="btn btn-secondary"
+              onClick={() => loadPage(nextCursor)}
+              disabled={loadingPage}
+            >
+              {loadingPage ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
 
       <style jsx>{`
@@ -410,6 +421,11 @@ const PaymentManagement = ({ payments, users }) => {
           color: #333;
         }
         
+        .load-more {
+          padding: 16px;
+          text-align: center;
+        }
+        
         .empty-state {
           padding: 40px;
           text-align: center;
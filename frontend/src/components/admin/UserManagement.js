@@ -1,7 +1,14 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
+import { adminAPI } from '../../services/api';
 
-const UserManagement = ({ users, onUserAction }) => {
+const PAGE_SIZE = 50;
+
+const UserManagement = ({ refreshKey, onUserAction }) => {
+  const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingPage, setLoadingPage] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [sortBy, setSortBy] = useState('id');
   const [sortOrder, setSortOrder] = useState('desc');
   const [filterAdmin, setFilterAdmin] = useState('all');
@@ -10,30 +17,32 @@ const UserManagement = ({ users, onUserAction }) => {
   const [showCreditModal, setShowCreditModal] = useState(false);
   const [creditAction, setCreditAction] = useState('grant');
 
-  const filteredUsers = users
-    .filter(user => {
-      const matchesSearch = user.username.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                           user.email.toLowerCase().includes(searchTerm.toLowerCase());
-      const matchesFilter = filterAdmin === 'all' || 
-                           (filterAdmin === 'admin' && user.is_admin) ||
-                           (filterAdmin === 'user' && !user.is_admin);
-      return matchesSearch && matchesFilter;
-    })
-    .sort((a, b) => {
-      let aVal = a[sortBy];
-      let bVal = b[sortBy];
-      
-      if (typeof aVal === 'string') {
-        aVal = aVal.toLowerCase();
-        bVal = bVal.toLowerCase();
-      }
-      
-      if (sortOrder === 'asc') {
-        return aVal > bVal ? 1 : -1;
-      } else {
-        return aVal < bVal ? 1 : -1;
-      }
-    });
+  // Wait for typing to pause before asking the server
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // Filtering and sorting happen on the server; pages are fetched by cursor
+  const loadPage = useCallback(async (cursor = null) => {
+    setLoadingPage(true);
+    try {
+      const params = { limit: PAGE_SIZE, sort: sortBy, order: sortOrder };
+      if (debouncedSearch) params.username = debouncedSearch;
+      if (filterAdmin !== 'all') params.is_admin = filterAdmin === 'admin';
+      if (cursor) params.cursor = cursor;
+      const response = await adminAPI.getUsers(params);
+      setUsers(prev => (cursor ? [...prev, ...response.data.items] : response.data.items));
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('User page loading error:', error);
+    }
+    setLoadingPage(false);
+  }, [sortBy, sortOrder, debouncedSearch, filterAdmin]);
+
+  useEffect(() => {
+    loadPage();
+  }, [loadPage, refreshKey]);
 
   const handleSort = (field) => {
     if (sortBy === field) {
@@ -74,7 +83,7 @@ const UserManagement = ({ users, onUserAction }) => {
           <div className="search-box">
             <input
               type="text"
-              placeholder="Search users..."
+              placeholder="Search by username..."
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
             />
@@ -99,9 +108,7 @@ const UserManagement = ({ users, onUserAction }) => {
               <th onClick={() => handleSort('username')} className="sortable">
                 Username {getSortIcon('username')}
               </th>
-              <th onClick={() => handleSort('email')} className="sortable">
-                Email {getSortIcon('email')}
-              </th>
+              <th>Email</th>
               <th onClick={() => handleSort('credits')} className="sortable">
                 Credits {getSortIcon('credits')}
               </th>
@@ -110,7 +117,7 @@ const UserManagement = ({ users, onUserAction }) => {
             </tr>
           </thead>
           <tbody>
-            {filteredUsers.map(user => (
+            {users.map(user => (
               <tr key={user.username}>
                 <td>
                   <div className="user-info">
@@ -163,11 +170,23 @@ const UserManagement = ({ users, onUserAction }) => {
           </tbody>
         </table>
 
-        {filteredUsers.length === 0 && (
+        {users.length === 0 && !loadingPage && (
           <div className="empty-state">
             <p>No users found matching your criteria</p>
           </div>
         )}
+
+        {nextCursor && (
+          <div className="load-more">
+            <button
+              className="btn btn-secondary"
+              onClick={() => loadPage(nextCursor)}
+              disabled={loadingPage}
+            >
+              {loadingPage ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
 
       {showCreditModal && selectedUser && (
@@ -371,6 +390,11 @@ const UserManagement = ({ users, onUserAction }) => {
           min-width: 32px;
         }
         
+        .load-more {
+          padding: 16px;
+          text-align: center;
+        }
+        
         .empty-state {
           padding: 40px;
           text-align: center;
@@ -69,11 +69,12 @@ export const responseAPI = {
 
 export const adminAPI = {
   getDashboard: () => api.get('/admin/dashboard'),
-  getUsers: () => api.get('/admin/users'),
+  // Keyset-paginated: pass { limit, cursor, sort, order, ...filters }, follow next_cursor
+  getUsers: (params = {}) => api.get('/admin/users', { params }),
   deleteUser: (userId) => api.delete(`/admin/users/${userId}`),
   grantCredits: (userId, amount) => api.post(`/admin/users/${userId}/grant_credits?amount=${amount}`),
   deductCredits: (userId, amount) => api.post(`/admin/users/${userId}/deduct_credits?amount=${amount}`),
-  getAllPayments: () => api.get('/admin/payments'),
+  getAllPayments: (params = {}) => api.get('/admin/payments', { params }),
   getUserPayments: (userId) => api.get(`/admin/payments/${userId}`),
 };
 